@@ -1,6 +1,11 @@
 # app.py
 import pygame
 import os
+import json
+import mmap
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 # --------------------------------------------------------------------------
 #                               CONSTANTS
@@ -8,7 +13,16 @@ import os
 
 WIDTH = 800
 HEIGHT = 600
-FPS = 60
+FPS = 60  # Simulation ticks per second; every frame-counted timer is really counted in ticks
+
+# Longest real-time gap the simulation catches up on in one rendered frame.
+# Past this the game slows down rather than stalling in a burst of catch-up ticks.
+MAX_FRAME_TIME = 0.25
+
+# Default size of the playable world. Larger than the window, the camera follows the player
+# and the chunked floor scrolls with it (main.py --world overrides it).
+WORLD_WIDTH = WIDTH
+WORLD_HEIGHT = HEIGHT
 
 PLAYER_SPEED = 3
 DEFAULT_ENEMY_SPEED = 1
@@ -20,63 +34,330 @@ PLAYER_SCALE_FACTOR = 2
 FLOOR_TILE_SCALE_FACTOR = 2
 HEALTH_SCALE_FACTOR = 3
 
+# Above this many dirty rects a single full-screen flip is cheaper
+DIRTY_RECT_LIMIT = 400
+
+# Level of detail: past this many enemies, far-away or tightly packed ones skip their
+# health bar, stars and animation
+LOD_ENEMY_THRESHOLD = 300
+LOD_DISTANCE = 300  # Pixels from the player
+LOD_CROWDING = 6  # Enemies sharing one spatial grid cell
+LOD_INTERVAL = 15  # Ticks between LOD passes; detail changes don't need to be instant
+
+# Bullet collisions index only the enemies near a bullet while there are this many
+# enemies per bullet, instead of building the grid over every enemy
+BULLET_SWEEP_RATIO = 8
+
 PUSHBACK_DISTANCE = 80
 ENEMY_KNOCKBACK_SPEED = 5
 
+# Tint multiplied into evolved enemies, by evolution level (3+ uses the last one)
+EVOLUTION_TINTS = [(255, 0, 0, 100), (128, 0, 128, 100), (255, 215, 0, 100)]
+
+# Per evolution: +2 max health, +0.2 size and +15% of the original speed, up to the caps
+EVOLUTION_HEALTH_STEP = 2
+EVOLUTION_SIZE_STEP = 0.2
+EVOLUTION_MAX_SIZE = 2.5
+EVOLUTION_SPEED_STEP = 0.15
+EVOLUTION_MAX_SPEED = 3  # Times the original speed
+
+BOSS_SIZE_MULTIPLIER = 2.0
+
+_evolution_tables = {}
+
+def evolution_table(base_size=1.0):
+    """(speed factor, size multiplier, tint level) by evolution level, for enemies starting at base_size.
+
+    The table stops at the first level where nothing but health changes any more;
+    later levels use its last row.
+    """
+    table = _evolution_tables.get(base_size)
+    if table is None:
+        table = [(1.0, base_size, 0)]
+        size = base_size
+        level = 0
+        while True:
+            level += 1
+            size = min(size + EVOLUTION_SIZE_STEP, EVOLUTION_MAX_SIZE)
+            row = (min(1 + level * EVOLUTION_SPEED_STEP, EVOLUTION_MAX_SPEED), size,
+                   min(level, len(EVOLUTION_TINTS)))
+            if row == table[-1]:
+                break
+            table.append(row)
+        _evolution_tables[base_size] = table
+    return table
+
 # --------------------------------------------------------------------------
-#                       ASSET LOADING FUNCTIONS
+#                             SPRITE ATLAS
 # --------------------------------------------------------------------------
 
-def load_frames(prefix, frame_count, scale_factor=1, folder="assets"):
-    frames = []
-    for i in range(frame_count):
-        image_path = os.path.join(folder, f"{prefix}_{i}.png")
-        img = pygame.image.load(image_path).convert_alpha()
+class SpriteAtlas(dict):
+    """Animation frames by name, plus cached flipped / evolved / scaled variants.
 
-        if scale_factor != 1:
-            w = img.get_width() * scale_factor
-            h = img.get_height() * scale_factor
+    Behaves like the plain {name: [frames]} dict it replaces, so existing
+    lookups keep working. image() builds each variant once and reuses it.
+    """
+
+    def __init__(self, frames_by_name):
+        super().__init__(frames_by_name)
+        self.variants = {}
+
+    def image(self, name, frame_index, facing_left=False, evolution_level=0, scale=1.0, alpha=255):
+        # Levels past the last tint look the same, so they share one cached image
+        evolution_level = min(evolution_level, len(EVOLUTION_TINTS))
+        key = (name, frame_index, facing_left, evolution_level, scale, alpha)
+        img = self.variants.get(key)
+        if img is None:
+            img = self.build(name, frame_index, facing_left, evolution_level, scale, alpha)
+            self.variants[key] = img
+        return img
+
+    def build(self, name, frame_index, facing_left, evolution_level, scale, alpha=255):
+        frames = self[name]
+        img = frames[frame_index]
+
+        if scale != 1 or evolution_level > 0:
+            # Size comes from the first frame so every frame of a level matches
+            w = max(10, int(frames[0].get_width() * scale))
+            h = max(10, int(frames[0].get_height() * scale))
             img = pygame.transform.scale(img, (w, h))
 
-        frames.append(img)
-    return frames
+        if evolution_level > 0:
+            tint = EVOLUTION_TINTS[evolution_level - 1]
+            tint_surface = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+            tint_surface.fill(tint)
+            img.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+        if facing_left:
+            img = pygame.transform.flip(img, True, False)
+
+        if alpha != 255:
+            # Own copy, so the shared frame is never changed while something draws it
+            img = img.copy()
+            img.set_alpha(alpha)
+
+        return img
+
+    def prebuild(self):
+        # Unevolved frames in both directions, so normal drawing never builds at runtime
+        for name, frames in self.items():
+            for i in range(len(frames)):
+                self.image(name, i, False)
+                self.image(name, i, True)
+
+    def prebuild_evolutions(self, table, names=None):
+        # Every frame of every stage in the evolution table, so evolving never builds at runtime
+        for name in names or list(self):
+            for speed_factor, size, tint in table:
+                for i in range(len(self[name])):
+                    self.image(name, i, False, tint, size)
+                    self.image(name, i, True, tint, size)
+
+# One shared surface per (size, color) for flat-colored sprites like bullets and coins
+_solid_surfaces = {}
+
+def solid_surface(size, color):
+    key = (int(size), color)
+    surf = _solid_surfaces.get(key)
+    if surf is None:
+        surf = pygame.Surface((key[0], key[0]), pygame.SRCALPHA)
+        surf.fill(color)
+        _solid_surfaces[key] = surf
+    return surf
 
-def load_floor_tiles(folder="assets"):
-    floor_tiles = []
-    for i in range(8):
-        path = os.path.join(folder, f"floor_{i}.png")
-        tile = pygame.image.load(path).convert()
+# Pre-rendered enemy health bars, keyed by (width, filled pixels)
+HEALTH_BAR_HEIGHT = 4
+_health_bars = {}
 
-        if FLOOR_TILE_SCALE_FACTOR != 1:
-            tw = tile.get_width() * FLOOR_TILE_SCALE_FACTOR
-            th = tile.get_height() * FLOOR_TILE_SCALE_FACTOR
-            tile = pygame.transform.scale(tile, (tw, th))
+def health_bar(width, health, max_health):
+    filled = max(0, min(width, int(width * health / max_health)))
+    key = (width, filled)
+    bar = _health_bars.get(key)
+    if bar is None:
+        bar = pygame.Surface((width, HEALTH_BAR_HEIGHT))
+        bar.fill((255, 0, 0))  # Background (red)
+        bar.fill((0, 255, 0), (0, 0, filled, HEALTH_BAR_HEIGHT))  # Foreground (green)
+        _health_bars[key] = bar
+    return bar
 
-        floor_tiles.append(tile)
-    return floor_tiles
+# Row of evolution stars, one per level, drawn right to left from the sprite's top-right corner
+_star_rows = {}
+
+def evolution_stars(level):
+    row = _star_rows.get(level)
+    if row is None:
+        row = pygame.Surface((8 * level, 7), pygame.SRCALPHA)
+        for i in range(level):
+            pygame.draw.circle(row, (255, 255, 0), (8 * level - 5 - i * 8, 3), 3)
+        _star_rows[level] = row
+    return row
+
+# --------------------------------------------------------------------------
+#                       ASSET LOADING FUNCTIONS
+# --------------------------------------------------------------------------
+
+# Pre-scaled pixels from earlier runs. Bump the version if the file layout changes.
+ASSET_CACHE_VERSION = 1
+ASSET_CACHE_PATH = os.path.join(".cache", "assets.bin")
+ASSET_CACHE_MAGIC = b"SHOOTRAC"
+ASSET_LOAD_THREADS = min(8, os.cpu_count() or 1)
+
+def decode_image(path, scale_factor):
+    # Runs on a worker thread: decode + scale only, no display calls
+    img = pygame.image.load(path)
+    if scale_factor != 1:
+        w = img.get_width() * scale_factor
+        h = img.get_height() * scale_factor
+        img = pygame.transform.scale(img, (w, h))
+    return img
+
+def read_asset_cache(cache_path):
+    # Returns (entries, buffer). Any problem just means an empty cache.
+    try:
+        with open(cache_path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_len = struct.unpack_from("<8sII", buf, 0)
+        if magic != ASSET_CACHE_MAGIC or version != ASSET_CACHE_VERSION:
+            return {}, None
+        header_start = struct.calcsize("<8sII")
+        entries = json.loads(buf[header_start:header_start + header_len])
+        data_start = header_start + header_len
+        for entry in entries.values():
+            entry["offset"] += data_start
+        return entries, buf
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, struct.error):
+        return {}, None
+
+def write_asset_cache(cache_path, images):
+    # images: {key: (mtime_ns, scale_factor, Surface)}, stored as one header + raw RGBA
+    entries = {}
+    blobs = []
+    offset = 0
+    for key, (mtime, scale_factor, img) in images.items():
+        data = pygame.image.tobytes(img, "RGBA")
+        entries[key] = {"mtime": mtime, "scale": scale_factor, "size": img.get_size(),
+                        "offset": offset, "length": len(data)}
+        blobs.append(data)
+        offset += len(data)
+
+    header = json.dumps(entries).encode()
+    tmp_path = None
+    try:
+        cache_dir = os.path.dirname(cache_path) or "."
+        os.makedirs(cache_dir, exist_ok=True)
+        # Own temp file per writer, so two games starting at once can't interleave their writes
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(cache_path) + ".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(struct.pack("<8sII", ASSET_CACHE_MAGIC, ASSET_CACHE_VERSION, len(header)))
+            f.write(header)
+            for data in blobs:
+                f.write(data)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write asset cache: {e}")
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def load_images(files, folder="assets", cache_path=ASSET_CACHE_PATH):
+    """Load (filename, scale_factor) pairs, from the disk cache when fresh, else in a thread pool.
+
+    Returns {(filename, scale_factor): Surface}. Surfaces are not converted yet.
+    """
+    entries, buf = read_asset_cache(cache_path) if cache_path else ({}, None)
+    images = {}
+    stale = []
+    mtimes = {}
+
+    for name, scale_factor in files:
+        path = os.path.join(folder, name)
+        mtime = os.stat(path).st_mtime_ns
+        mtimes[(name, scale_factor)] = mtime
+        entry = entries.get(f"{name}@{scale_factor}")
+        try:
+            if entry and entry["mtime"] == mtime and entry["scale"] == scale_factor:
+                start = entry["offset"]
+                data = buf[start:start + entry["length"]]
+                images[(name, scale_factor)] = pygame.image.frombytes(data, tuple(entry["size"]), "RGBA")
+                continue
+        except (KeyError, TypeError, ValueError):
+            pass  # Malformed or truncated entry, decode the file instead
+        stale.append((name, scale_factor))
+
+    if buf is not None:
+        buf.close()
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=ASSET_LOAD_THREADS) as pool:
+            decoded = pool.map(lambda item: decode_image(os.path.join(folder, item[0]), item[1]), stale)
+            for item, img in zip(stale, decoded):
+                images[item] = img
+
+        if cache_path:
+            write_asset_cache(cache_path, {
+                f"{name}@{scale_factor}": (mtimes[(name, scale_factor)], scale_factor, img)
+                for (name, scale_factor), img in images.items()
+            })
+
+    return images
+
+def frame_files(prefix, frame_count):
+    return [f"{prefix}_{i}.png" for i in range(frame_count)]
+
+def load_frames(prefix, frame_count, scale_factor=1, folder="assets", images=None):
+    # images: optional result of load_images() that already holds these files
+    names = frame_files(prefix, frame_count)
+    if images is None:
+        images = load_images([(name, scale_factor) for name in names], folder)
+    return [images[(name, scale_factor)].convert_alpha() for name in names]
+
+def load_floor_tiles(folder="assets", images=None):
+    names = frame_files("floor", 8)
+    if images is None:
+        images = load_images([(name, FLOOR_TILE_SCALE_FACTOR) for name in names], folder)
+    return [images[(name, FLOOR_TILE_SCALE_FACTOR)].convert() for name in names]
 
 def load_assets():
     assets = {}
 
     try:
+        # Decode everything in one batch (cache or thread pool), then convert on this thread
+        groups = [
+            ("orc", 4, ENEMY_SCALE_FACTOR),
+            ("undead", 4, ENEMY_SCALE_FACTOR),
+            ("demon", 4, ENEMY_SCALE_FACTOR),
+            ("player_idle", 4, PLAYER_SCALE_FACTOR),
+            ("player_run", 4, PLAYER_SCALE_FACTOR),
+            ("floor", 8, FLOOR_TILE_SCALE_FACTOR),
+            ("health", 6, HEALTH_SCALE_FACTOR),
+        ]
+        images = load_images([(name, scale) for prefix, count, scale in groups
+                              for name in frame_files(prefix, count)])
+
         # Enemies
-        assets["enemies"] = {
-            "orc":    load_frames("orc",    4, scale_factor=ENEMY_SCALE_FACTOR),
-            "undead": load_frames("undead", 4, scale_factor=ENEMY_SCALE_FACTOR),
-            "demon":  load_frames("demon",  4, scale_factor=ENEMY_SCALE_FACTOR),
-        }
+        assets["enemies"] = SpriteAtlas({
+            "orc":    load_frames("orc",    4, scale_factor=ENEMY_SCALE_FACTOR, images=images),
+            "undead": load_frames("undead", 4, scale_factor=ENEMY_SCALE_FACTOR, images=images),
+            "demon":  load_frames("demon",  4, scale_factor=ENEMY_SCALE_FACTOR, images=images),
+        })
+        assets["enemies"].prebuild()
+        assets["enemies"].prebuild_evolutions(evolution_table())
+        assets["enemies"].prebuild_evolutions(evolution_table(BOSS_SIZE_MULTIPLIER), names=["demon"])
 
         # Player
-        assets["player"] = {
-            "idle": load_frames("player_idle", 4, scale_factor=PLAYER_SCALE_FACTOR),
-            "run":  load_frames("player_run",  4, scale_factor=PLAYER_SCALE_FACTOR),
-        }
+        assets["player"] = SpriteAtlas({
+            "idle": load_frames("player_idle", 4, scale_factor=PLAYER_SCALE_FACTOR, images=images),
+            "run":  load_frames("player_run",  4, scale_factor=PLAYER_SCALE_FACTOR, images=images),
+        })
+        assets["player"].prebuild()
 
         # Floor tiles
-        assets["floor_tiles"] = load_floor_tiles()
+        assets["floor_tiles"] = load_floor_tiles(images=images)
 
         # Health images
-        assets["health"] = load_frames("health", 6, scale_factor=HEALTH_SCALE_FACTOR)
+        assets["health"] = load_frames("health", 6, scale_factor=HEALTH_SCALE_FACTOR, images=images)
 
     except Exception as e:
         print(f"Error loading assets: {e}")
@@ -0,0 +1,102 @@
+# background.py
+import random
+from collections import OrderedDict
+
+import pygame
+
+class Camera:
+    """Screen-sized window onto the world, kept inside the world bounds."""
+
+    def __init__(self, width, height, world_width, world_height):
+        self.width = width
+        self.height = height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y):
+        # Centre on (x, y) without showing anything outside the world
+        self.x = int(max(0, min(x - self.width // 2, self.world_width - self.width)))
+        self.y = int(max(0, min(y - self.height // 2, self.world_height - self.height)))
+
+    def to_world(self, pos):
+        # Screen position (e.g. a mouse click) to world coordinates
+        return pos[0] + self.x, pos[1] + self.y
+
+    @property
+    def offset(self):
+        return self.x, self.y
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+class ChunkedBackground:
+    """Tiled floor generated lazily in fixed-size chunks, with an LRU cache capped by memory.
+
+    A chunk's tiles depend only on (seed, chunk x, chunk y), so evicted chunks come back identical.
+    """
+
+    def __init__(self, tiles, seed, chunk_tiles=16, max_bytes=16 * 1024 * 1024):
+        self.tiles = tiles
+        self.seed = seed
+        self.tile_w = tiles[0].get_width()
+        self.tile_h = tiles[0].get_height()
+        self.chunk_tiles = chunk_tiles
+        self.chunk_w = self.tile_w * chunk_tiles
+        self.chunk_h = self.tile_h * chunk_tiles
+
+        chunk_bytes = self.chunk_w * self.chunk_h * tiles[0].get_bytesize()
+        self.max_chunks = max(1, max_bytes // chunk_bytes)
+        self.chunks = OrderedDict()  # (cx, cy) -> Surface, least recently used first
+        self.built = 0
+
+        self.view_surface = None
+        self.view_rect = None
+
+    def build_chunk(self, cx, cy):
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        chunk = pygame.Surface((self.chunk_w, self.chunk_h)).convert(self.tiles[0])
+        for ty in range(self.chunk_tiles):
+            for tx in range(self.chunk_tiles):
+                chunk.blit(rng.choice(self.tiles), (tx * self.tile_w, ty * self.tile_h))
+        self.built += 1
+        return chunk
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = self.build_chunk(cx, cy)
+        self.chunks[key] = chunk
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def visible_chunks(self, rect):
+        # Chunk coordinates overlapping a world-space rect
+        for cy in range(rect.top // self.chunk_h, (rect.bottom - 1) // self.chunk_h + 1):
+            for cx in range(rect.left // self.chunk_w, (rect.right - 1) // self.chunk_w + 1):
+                yield cx, cy
+
+    def draw(self, surface, view):
+        # Blit only the chunks overlapping view, a world-space rect, with view's corner at (0, 0)
+        # Keep the chunks for this view from evicting each other
+        needed = sum(1 for _ in self.visible_chunks(view))
+        self.max_chunks = max(self.max_chunks, needed)
+        for cx, cy in self.visible_chunks(view):
+            surface.blit(self.chunk(cx, cy), (cx * self.chunk_w - view.x, cy * self.chunk_h - view.y))
+
+    def view(self, rect):
+        # Copy of the floor under rect, re-rendered only when rect changes
+        if self.view_surface is None or self.view_surface.get_size() != rect.size:
+            self.view_surface = pygame.Surface(rect.size).convert(self.tiles[0])
+            self.view_rect = None
+        if self.view_rect != rect:
+            self.draw(self.view_surface, rect)
+            self.view_rect = pygame.Rect(rect)
+        return self.view_surface
@@ -0,0 +1,201 @@
+# batch.py
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pygame
+
+import app
+from inputs import KeyState
+
+DIRECTIONS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+SHOOT = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+
+# Agents play one tick: set the held keys and send any events before the game updates
+
+def idle_agent(game, keys, rng):
+    # Stands still and auto-aims at the nearest enemy
+    if game.tick % 10 == 0:
+        game.process_event(SHOOT)
+
+def random_agent(game, keys, rng):
+    # Wanders in a new random direction every second, shooting as it goes
+    if game.tick % app.FPS == 0:
+        keys.set(rng.sample(DIRECTIONS, rng.randint(0, 2)))
+    if game.tick % 10 == 0:
+        game.process_event(SHOOT)
+
+def kite_agent(game, keys, rng):
+    # Backs away from the nearest enemy, away from the walls, and keeps shooting
+    nearest = game.find_nearest_enemy()
+    held = []
+    if nearest is not None:
+        dx = game.player.x - nearest.x
+        dy = game.player.y - nearest.y
+        # Steer back towards the middle when pinned against an edge
+        dx += (app.WIDTH / 2 - game.player.x) * 0.5
+        dy += (app.HEIGHT / 2 - game.player.y) * 0.5
+        if abs(dx) > 1:
+            held.append(pygame.K_RIGHT if dx > 0 else pygame.K_LEFT)
+        if abs(dy) > 1:
+            held.append(pygame.K_DOWN if dy > 0 else pygame.K_UP)
+    keys.set(held)
+    if game.tick % 5 == 0:
+        game.process_event(SHOOT)
+
+AGENTS = {
+    "idle": idle_agent,
+    "random": random_agent,
+    "kite": kite_agent,
+}
+
+def apply_params(game, params):
+    # Overrides are Game attribute names; upgrade_caps is merged rather than replaced
+    for key, value in params.items():
+        if key == "upgrade_caps":
+            game.upgrade_caps.update(value)
+        elif hasattr(game, key):
+            setattr(game, key, value)
+        else:
+            raise ValueError(f"Unknown parameter {key!r}")
+
+def run_session(param_name, params, agent_name, seed, max_ticks, use_swarm=False):
+    """Play one headless session to death or max_ticks. Runs in a worker process."""
+    from game import Game  # Imported in the worker so the parent never opens a display
+
+    keys = KeyState()
+    game = Game(use_swarm=use_swarm, headless=True, seed=seed, input_source=keys.get_pressed)
+    apply_params(game, params)
+    agent = AGENTS[agent_name]
+    rng = random.Random(seed)
+    game.choose_upgrade = lambda options: rng.randrange(len(options))
+
+    peaks = {"enemies": 0, "bullets": 0, "coins": 0}
+    start = time.perf_counter()
+    while game.tick < max_ticks:
+        agent(game, keys, rng)
+        if game.step(1) == 0:
+            break
+        peaks["enemies"] = max(peaks["enemies"], len(game.enemies))
+        peaks["bullets"] = max(peaks["bullets"], len(game.player.bullets))
+        peaks["coins"] = max(peaks["coins"], len(game.coins))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "params": param_name,
+        "agent": agent_name,
+        "seed": seed,
+        "died": game.game_over,
+        "survival_s": game.tick / app.FPS,
+        "kills": game.kills,
+        "level": game.player.level,
+        "xp": game.player.xp,
+        "peak_enemies": peaks["enemies"],
+        "peak_bullets": peaks["bullets"],
+        "peak_coins": peaks["coins"],
+        "ticks_per_s": game.tick / elapsed if elapsed > 0 else 0.0,
+    }
+
+def aggregate(sessions):
+    # One row per (parameter set, agent) with averages and peaks over seeds
+    groups = {}
+    for session in sessions:
+        groups.setdefault((session["params"], session["agent"]), []).append(session)
+
+    rows = []
+    for (param_name, agent_name), group in sorted(groups.items()):
+        survival = [s["survival_s"] for s in group]
+        rows.append({
+            "params": param_name,
+            "agent": agent_name,
+            "runs": len(group),
+            "deaths": sum(s["died"] for s in group),
+            "survival_s_mean": round(statistics.mean(survival), 2),
+            "survival_s_median": round(statistics.median(survival), 2),
+            "survival_s_min": round(min(survival), 2),
+            "kills_mean": round(statistics.mean(s["kills"] for s in group), 2),
+            "level_mean": round(statistics.mean(s["level"] for s in group), 2),
+            "level_max": max(s["level"] for s in group),
+            "peak_enemies": max(s["peak_enemies"] for s in group),
+            "peak_bullets": max(s["peak_bullets"] for s in group),
+            "peak_coins": max(s["peak_coins"] for s in group),
+        })
+    return rows
+
+def load_param_sets(path):
+    # JSON object of {name: {game attribute: value}}; a plain list gets numbered names
+    if not path:
+        return {"baseline": {}}
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {f"set{i}": params for i, params in enumerate(data)}
+    return data
+
+def run_batch(param_sets, agents, seeds, max_ticks, workers, use_swarm=False):
+    jobs = [(name, params, agent, seed, max_ticks, use_swarm)
+            for name, params in param_sets.items()
+            for agent in agents
+            for seed in seeds]
+
+    sessions = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_session, *job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                sessions.append(future.result())
+            except Exception as e:
+                print(f"Session error: {e}")
+            print(f"\r{done}/{len(jobs)} sessions", end="", flush=True)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s on {workers} workers")
+
+    sessions.sort(key=lambda s: (s["params"], s["agent"], s["seed"]))
+    return sessions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless balance simulations across a process pool")
+    parser.add_argument("--params", metavar="PATH",
+                        help='JSON parameter sets, e.g. {"fast_spawn": {"enemy_spawn_interval": 30}}')
+    parser.add_argument("--agents", nargs="+", choices=sorted(AGENTS), default=["random", "kite"])
+    parser.add_argument("--seeds", type=int, default=8, help="sessions per parameter set and agent")
+    parser.add_argument("--seed-base", type=int, default=1)
+    parser.add_argument("--max-minutes", type=float, default=10, help="game time limit per session")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--swarm", action="store_true", help="use the NumPy enemy backend")
+    parser.add_argument("--output", default="batch_report.json", help="JSON report path ('' to skip)")
+    args = parser.parse_args()
+
+    param_sets = load_param_sets(args.params)
+    seeds = range(args.seed_base, args.seed_base + args.seeds)
+    max_ticks = math.ceil(args.max_minutes * 60 * app.FPS)
+
+    sessions = run_batch(param_sets, args.agents, seeds, max_ticks, args.workers, args.swarm)
+    rows = aggregate(sessions)
+
+    print(f"{'params':<16} {'agent':<8} {'runs':>4} {'deaths':>6} {'surv s':>8} {'kills':>7} "
+          f"{'level':>6} {'peak enemies':>13}")
+    for row in rows:
+        print(f"{row['params']:<16} {row['agent']:<8} {row['runs']:>4} {row['deaths']:>6} "
+              f"{row['survival_s_mean']:>8.1f} {row['kills_mean']:>7.1f} {row['level_mean']:>6.1f} "
+              f"{row['peak_enemies']:>13}")
+
+    if args.output:
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "max_ticks": max_ticks,
+            "param_sets": param_sets,
+            "summary": rows,
+            "sessions": sessions,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+# benchmark.py
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+import app
+from enemy import Enemy
+from boss import Boss
+from bullet import Bullet, bullet_pool
+from coin import Coin, coin_pool
+from player import Player
+from powerup import PowerUp
+from spatial import SpatialHash
+from swarm import EnemySwarm, swarm_available
+
+class Body:
+    # Minimal stand-in for anything with a rect and an x, y centre (bullets, enemies)
+    def __init__(self, rect):
+        self.rect = rect
+
+def make_bodies(count, size, rng):
+    bodies = []
+    for _ in range(count):
+        rect = pygame.Rect(0, 0, size, size)
+        rect.center = (rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT))
+        body = Body(rect)
+        body.x, body.y = rect.center
+        bodies.append(body)
+    return bodies
+
+def naive_hits(bullets, enemies):
+    # The original nested loop: every bullet against every enemy
+    hits = 0
+    for bullet in bullets:
+        for enemy in enemies:
+            if bullet.rect.colliderect(enemy.rect):
+                hits += 1
+                break
+    return hits
+
+def grid_hits(bullets, enemies, grid):
+    grid.rebuild(enemies)
+    hits = 0
+    for bullet in bullets:
+        if grid.hits(bullet.rect):
+            hits += 1
+    return hits
+
+def time_call(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_collisions(sizes, repeat, seed):
+    print(f"{'N':>6} {'naive ms':>10} {'grid ms':>10} {'speedup':>8} {'grid us/N':>10}")
+    for n in sizes:
+        rng = random.Random(seed)
+        enemies = make_bodies(n, 32, rng)
+        bullets = make_bodies(n, 10, rng)
+        grid = SpatialHash()
+
+        # Sanity check: both paths must agree
+        assert naive_hits(bullets, enemies) == grid_hits(bullets, enemies, grid)
+
+        naive = time_call(lambda: naive_hits(bullets, enemies), repeat)
+        spatial = time_call(lambda: grid_hits(bullets, enemies, grid), repeat)
+        print(f"{n:>6} {naive * 1000:>10.2f} {spatial * 1000:>10.2f} "
+              f"{naive / spatial:>7.1f}x {spatial * 1e6 / n:>10.2f}")
+
+def bench_nearest(sizes, queries, seed):
+    print(f"{'N':>6} {'scan us':>9} {'grid us':>9} {'speedup':>8}")
+    for n in sizes:
+        rng = random.Random(seed)
+        enemies = make_bodies(n, 32, rng)
+        points = [(rng.uniform(0, app.WIDTH), rng.uniform(0, app.HEIGHT)) for _ in range(queries)]
+
+        def scan():
+            # The old find_nearest_enemy: distance to every enemy
+            for px, py in points:
+                min(enemies, key=lambda e: ((e.x - px) ** 2 + (e.y - py) ** 2) ** 0.5)
+
+        grid = SpatialHash()
+        grid.rebuild(enemies)  # Once per tick in the game, shared by every query
+
+        def indexed():
+            for px, py in points:
+                grid.nearest(px, py, 1)
+
+        linear = time_call(scan, 3) / queries
+        spatial = time_call(indexed, 3) / queries
+        print(f"{n:>6} {linear * 1e6:>9.1f} {spatial * 1e6:>9.1f} {linear / spatial:>7.1f}x")
+
+def make_enemy_frames():
+    # Plain surfaces shaped like the real sprites, so no display is needed
+    return app.SpriteAtlas({"orc": [pygame.Surface((32, 46), pygame.SRCALPHA) for _ in range(4)]})
+
+def bench_swarm(sizes, ticks, seed):
+    if not swarm_available():
+        print("numpy not installed, skipping swarm benchmark")
+        return
+
+    frames = make_enemy_frames()
+    target = Body(pygame.Rect(0, 0, 1, 1))
+    target.x, target.y = app.WIDTH // 2, app.HEIGHT // 2
+
+    print(f"{'N':>6} {'objects ms':>11} {'swarm ms':>10} {'speedup':>8}")
+    for n in sizes:
+        rng = random.Random(seed)
+        points = [(rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT)) for _ in range(n)]
+
+        enemies = [Enemy(x, y, "orc", frames) for x, y in points]
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for enemy in enemies:
+                enemy.update(target)
+        objects = (time.perf_counter() - start) / ticks
+
+        swarm = EnemySwarm()
+        for x, y in points:
+            swarm.spawn(x, y, "orc", frames)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            swarm.update(target)
+        batched = (time.perf_counter() - start) / ticks
+
+        print(f"{n:>6} {objects * 1000:>11.2f} {batched * 1000:>10.2f} {objects / batched:>7.1f}x")
+
+def bench_knockback(sizes, radius, seed):
+    if not swarm_available():
+        print("numpy not installed, skipping knockback benchmark")
+        return
+
+    frames = make_enemy_frames()
+    px, py = app.WIDTH // 2, app.HEIGHT // 2
+
+    print(f"{'N':>6} {'per-enemy ms':>13} {'wave ms':>8} {f'r={radius} ms':>10} {'speedup':>8}")
+    for n in sizes:
+        rng = random.Random(seed)
+        swarm = EnemySwarm()
+        enemies = [swarm.spawn(rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT), "orc", frames)
+                   for _ in range(n)]
+
+        def per_enemy():
+            # The old check_player_enemy_collisions loop
+            for enemy in enemies:
+                enemy.set_knockback(px, py, app.PUSHBACK_DISTANCE)
+
+        objects = time_call(per_enemy, 5)
+        wave = time_call(lambda: swarm.knockback(px, py, app.PUSHBACK_DISTANCE), 5)
+        limited = time_call(lambda: swarm.knockback(px, py, app.PUSHBACK_DISTANCE, radius), 5)
+        print(f"{n:>6} {objects * 1000:>13.2f} {wave * 1000:>8.3f} {limited * 1000:>10.3f} "
+              f"{objects / wave:>7.1f}x")
+
+def bench_evolution(sizes, seed):
+    # One wave of N enemies evolving on the same tick
+    print(f"{'N':>6} {'cold ms':>8} {'baked ms':>9} {'swarm ms':>9}")
+    for n in sizes:
+        rng = random.Random(seed)
+        points = [(rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT)) for _ in range(n)]
+
+        # Cold: the first wave to reach a level builds its scaled, tinted sprites
+        frames = make_enemy_frames()
+        enemies = [Enemy(x, y, "orc", frames) for x, y in points]
+        cold = time_call(lambda: [enemy.evolve() for enemy in enemies], 1)
+
+        frames.prebuild_evolutions(app.evolution_table())
+        enemies = [Enemy(x, y, "orc", frames) for x, y in points]
+        baked = time_call(lambda: [enemy.evolve() for enemy in enemies], 1)
+
+        if swarm_available():
+            swarm = EnemySwarm()
+            for x, y in points:
+                swarm.spawn(x, y, "orc", frames)
+            batched = time_call(lambda: swarm.evolve(list(range(n))), 1)
+            swarm_ms = f"{batched * 1000:>9.2f}"
+        else:
+            swarm_ms = f"{'-':>9}"
+        print(f"{n:>6} {cold * 1000:>8.2f} {baked * 1000:>9.2f} {swarm_ms}")
+
+def shallow_size(obj):
+    # The instance itself plus its attribute dict, if the class has one
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+def bench_memory(count):
+    frames = make_enemy_frames()
+    player_assets = {"player": app.SpriteAtlas({"idle": [pygame.Surface((32, 46), pygame.SRCALPHA)]})}
+    makers = {
+        "Enemy": lambda i: Enemy(i % app.WIDTH, i % app.HEIGHT, "orc", frames),
+        "Boss": lambda i: Boss(i % app.WIDTH, i % app.HEIGHT, "orc", frames),
+        "Player": lambda i: Player(i % app.WIDTH, i % app.HEIGHT, player_assets),
+        "Bullet": lambda i: Bullet(i % app.WIDTH, i % app.HEIGHT, 1.0, 0.0, 10),
+        "Coin": lambda i: Coin(i % app.WIDTH, i % app.HEIGHT),
+        "PowerUp": lambda i: PowerUp(i % app.WIDTH, i % app.HEIGHT, "health"),
+    }
+    if swarm_available():
+        swarm = EnemySwarm(capacity=count + 1)  # Arrays allocated up front, room for the warm-up one too
+        makers["SwarmEnemy"] = lambda i: swarm.spawn(i % app.WIDTH, i % app.HEIGHT, "orc", frames)
+
+    # Warm shared caches (scaled sprites, solid surfaces) so they aren't billed to the first batch
+    for make in makers.values():
+        make(0)
+
+    print(f"{'class':<11} {'slots':>5} {'shallow B':>10} {'traced B/entity':>16}")
+    for name, make in makers.items():
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        entities = [make(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # Subtract the list holding them
+        traced = (after - before - sys.getsizeof(entities)) / count
+        has_slots = not hasattr(entities[0], "__dict__")
+        print(f"{name:<11} {'yes' if has_slots else 'no':>5} {shallow_size(entities[0]):>10} {traced:>16.0f}")
+
+def build_game(enemies, bullets, coins, seed, use_swarm=False):
+    # Headless game populated with a fixed mix of entities
+    from game import Game  # Imported here so the other benchmarks don't need a display
+
+    game = Game(use_swarm=use_swarm, headless=True, seed=seed)
+    rng = random.Random(seed)
+    game.player.health = 10 ** 9  # Never die mid-measurement
+    game.enemy_spawn_interval = 10 ** 9  # Only the seeded entities
+
+    assets = game.assets["enemies"]
+    types = list(assets.keys())
+    for i in range(enemies):
+        x, y = rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT)
+        if i % 100 == 99:
+            enemy = Boss(x, y, "demon", assets, rng=game.rng)  # One boss per hundred
+        else:
+            if game.swarm is not None:
+                enemy = game.swarm.spawn(x, y, rng.choice(types), assets)
+            else:
+                enemy = Enemy(x, y, rng.choice(types), assets)
+        enemy.evolve_threshold = game.enemy_evolve_threshold
+        game.schedule_evolution(enemy)  # Same timers as spawn_enemies / spawn_boss
+        game.add_enemy(enemy)
+
+    top_up(game, rng, bullets, coins)
+    return game
+
+def top_up(game, rng, bullets, coins):
+    # Add bullets and coins until there are that many again, replacing what a tick used up
+    player = game.player
+    for _ in range(bullets - len(player.bullets)):
+        angle = rng.uniform(0, 2 * math.pi)
+        player.bullets.append(bullet_pool.acquire(
+            rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT),
+            math.cos(angle) * player.bullet_speed, math.sin(angle) * player.bullet_speed,
+            player.bullet_size))
+
+    for _ in range(coins - len(game.coins)):
+        game.coins.append(coin_pool.acquire(rng.randint(0, app.WIDTH), rng.randint(0, app.HEIGHT)))
+
+def measure(func, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        func()
+    elapsed = time.perf_counter() - start
+    return ticks / elapsed if elapsed > 0 else float("inf")
+
+def measure_update(game, ticks, rng, bullets, coins):
+    # Like measure(game.update), but bullets and coins are topped back up before every tick,
+    # outside the timed section, so each tick sees the full load instead of only the first
+    elapsed = 0.0
+    for _ in range(ticks):
+        top_up(game, rng, bullets, coins)
+        start = time.perf_counter()
+        game.update()
+        elapsed += time.perf_counter() - start
+    return ticks / elapsed if elapsed > 0 else float("inf")
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_sweep(sizes, ticks, seed, bullet_ratio, coin_ratio, use_swarm, output):
+    results = []
+    print(f"{'enemies':>8} {'bullets':>8} {'coins':>6} {'update/s':>10} {'draw/s':>8}")
+    for n in sizes:
+        bullets = int(n * bullet_ratio)
+        coins = int(n * coin_ratio)
+
+        # Fresh game per phase so update() kills and bullet drift don't skew draw()
+        game = build_game(n, bullets, coins, seed, use_swarm)
+        update_tps = measure_update(game, ticks, random.Random(seed), bullets, coins)
+
+        game = build_game(n, bullets, coins, seed, use_swarm)
+        draw_fps = measure(game.draw, ticks)
+
+        results.append({
+            "enemies": n,
+            "bullets": bullets,
+            "coins": coins,
+            "update_ticks_per_s": round(update_tps, 2),
+            "draw_frames_per_s": round(draw_fps, 2),
+        })
+        print(f"{n:>8} {bullets:>8} {coins:>6} {update_tps:>10.1f} {draw_fps:>8.1f}")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "swarm": use_swarm,
+        "seed": seed,
+        "ticks": ticks,
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {output}")
+    return report
+
+def compare(old_path, new_path):
+    # Ratio of new/old throughput per size; above 1.0 means faster
+    with open(old_path) as f:
+        old = {r["enemies"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["enemies"]: r for r in json.load(f)["results"]}
+
+    print(f"{'enemies':>8} {'update':>8} {'draw':>8}")
+    for n in sorted(old.keys() & new.keys()):
+        update = new[n]["update_ticks_per_s"] / old[n]["update_ticks_per_s"]
+        draw = new[n]["draw_frames_per_s"] / old[n]["draw_frames_per_s"]
+        print(f"{n:>8} {update:>7.2f}x {draw:>7.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Shooter performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    collisions = sub.add_parser("collisions", help="bullet-vs-enemy broadphase, N bullets x N enemies")
+    collisions.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000])
+    collisions.add_argument("--repeat", type=int, default=5)
+    collisions.add_argument("--seed", type=int, default=1)
+
+    swarm = sub.add_parser("swarm", help="per-object Enemy.update vs EnemySwarm.update, ms per tick")
+    swarm.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 5000, 10000])
+    swarm.add_argument("--ticks", type=int, default=60)
+    swarm.add_argument("--seed", type=int, default=1)
+
+    sweep = sub.add_parser("sweep", help="headless Game update() and draw() throughput at scaled entity counts")
+    sweep.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2500, 5000, 10000],
+                       help="enemy counts to sweep")
+    sweep.add_argument("--ticks", type=int, default=30)
+    sweep.add_argument("--seed", type=int, default=1)
+    sweep.add_argument("--bullet-ratio", type=float, default=0.25, help="bullets per enemy")
+    sweep.add_argument("--coin-ratio", type=float, default=0.25, help="coins per enemy")
+    sweep.add_argument("--swarm", action="store_true", help="use the NumPy enemy backend")
+    sweep.add_argument("--output", default="bench_results.json", help="JSON results path ('' to skip)")
+
+    nearest = sub.add_parser("nearest", help="nearest-enemy query: linear scan vs grid index")
+    nearest.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 10000])
+    nearest.add_argument("--queries", type=int, default=200)
+    nearest.add_argument("--seed", type=int, default=1)
+
+    knockback = sub.add_parser("knockback", help="knockback on player hit: per-enemy calls vs one swarm wave")
+    knockback.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 5000, 10000])
+    knockback.add_argument("--radius", type=float, default=200)
+    knockback.add_argument("--seed", type=int, default=1)
+
+    evolution = sub.add_parser("evolution", help="a wave of N enemies evolving on one tick")
+    evolution.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    evolution.add_argument("--seed", type=int, default=1)
+
+    memory = sub.add_parser("memory", help="bytes per entity for each entity class")
+    memory.add_argument("--count", type=int, default=10000, help="entities of each class to create")
+
+    comp = sub.add_parser("compare", help="compare two sweep result files")
+    comp.add_argument("old")
+    comp.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "sweep":
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        bench_sweep(args.sizes, args.ticks, args.seed, args.bullet_ratio, args.coin_ratio,
+                    args.swarm, args.output)
+    elif args.command == "nearest":
+        bench_nearest(args.sizes, args.queries, args.seed)
+    elif args.command == "compare":
+        compare(args.old, args.new)
+    elif args.command == "collisions":
+        bench_collisions(args.sizes, args.repeat, args.seed)
+    elif args.command == "swarm":
+        bench_swarm(args.sizes, args.ticks, args.seed)
+    elif args.command == "memory":
+        bench_memory(args.count)
+    elif args.command == "knockback":
+        bench_knockback(args.sizes, args.radius, args.seed)
+    elif args.command == "evolution":
+        bench_evolution(args.sizes, args.seed)
+
+if __name__ == "__main__":
+    main()
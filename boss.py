@@ -1,20 +1,22 @@
+import app
 from enemy import Enemy
 import math
 import random
 
 class Boss(Enemy):
-    def __init__(self, x, y, enemy_type, enemy_assets, health=10):
+    __slots__ = ("rng",)
+
+    evolution = app.evolution_table(app.BOSS_SIZE_MULTIPLIER)
+
+    def __init__(self, x, y, enemy_type, enemy_assets, health=10, rng=None):
         super().__init__(x, y, enemy_type, enemy_assets)
+        self.rng = rng or random  # Seeded by the game for reproducible sessions
         self.health = health
-        self.size_multiplier = 2.0  # Bosses are bigger
+        self.size_multiplier = app.BOSS_SIZE_MULTIPLIER  # Bosses are bigger
         self.speed *= 0.75  # Slower but tougher
         
-        # Scale the boss sprite
-        self.image = pygame.transform.scale(
-            self.image,
-            (int(self.image.get_width() * self.size_multiplier),
-             int(self.image.get_height() * self.size_multiplier))
-        )
+        # Scaled boss sprite, cached by the atlas and kept through animation
+        self.image = self.current_image()
         self.rect = self.image.get_rect(center=(x, y))
         
     def take_damage(self, amount):
@@ -24,7 +26,7 @@ class Boss(Enemy):
     def update(self, player):
         super().update(player)
         # Special attack pattern
-        if random.random() < 0.02:  # 2% chance per frame to charge
+        if self.rng.random() < 0.02:  # 2% chance per frame to charge
             self.charge_at_player(player)
             
     def charge_at_player(self, player):
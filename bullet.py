@@ -1,17 +1,23 @@
 # bullet.py
 import app
-import pygame
+from pool import Pool
+
+BULLET_COLOR = (255, 255, 255)  # White color for bullets
 
 class Bullet:
+    __slots__ = ("x", "y", "vx", "vy", "size", "image", "rect", "entity_id")
+
     def __init__(self, x, y, vx, vy, size):
+        self.reset(x, y, vx, vy, size)
+
+    def reset(self, x, y, vx, vy, size):
         self.x = x
         self.y = y
         self.vx = vx
         self.vy = vy
         self.size = size
 
-        self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)  # Use pygame directly
-        self.image.fill((255, 255, 255))  # White color for bullets
+        self.image = app.solid_surface(self.size, BULLET_COLOR)  # Shared, never drawn on
         self.rect = self.image.get_rect(center=(self.x, self.y))
 
     def update(self):
@@ -20,4 +26,7 @@ class Bullet:
         self.rect.center = (self.x, self.y)
 
     def draw(self, surface):
-        surface.blit(self.image, self.rect)
\ No newline at end of file
+        surface.blit(self.image, self.rect)
+
+# Spent bullets go back here instead of being garbage collected
+bullet_pool = Pool(Bullet)
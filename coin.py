@@ -1,13 +1,24 @@
 # coin.py
 import app
+from pool import Pool
+
+COIN_COLOR = (255, 215, 0)  # Gold color
+COIN_SIZE = 15
 
 class Coin:
+    __slots__ = ("x", "y", "image", "rect", "entity_id")
+
     def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
         self.x = x
         self.y = y
-        self.image = app.pygame.Surface((15, 15), app.pygame.SRCALPHA)
-        self.image.fill((255, 215, 0))  # Gold color
+        self.image = app.solid_surface(COIN_SIZE, COIN_COLOR)
         self.rect = self.image.get_rect(center=(self.x, self.y))
 
     def draw(self, surface):
-        surface.blit(self.image, self.rect)
\ No newline at end of file
+        surface.blit(self.image, self.rect)
+
+# Collected coins go back here instead of being garbage collected
+coin_pool = Pool(Coin)
@@ -2,20 +2,28 @@ import pygame
 import app
 import math
 
-class Enemy:
+class EnemyBase:
+    """Enemy behaviour. Subclasses decide where the state is stored."""
+    __slots__ = ()
+
+    swarm = None  # Set when the enemy's state lives in an EnemySwarm
+    animation_speed = 8  # Ticks per animation frame
+    evolution = app.evolution_table()  # Stats and sprite stage by evolution level
+
     def __init__(self, x, y, enemy_type, enemy_assets, speed=app.DEFAULT_ENEMY_SPEED):
         # Initialize enemy properties
         self.x = x
         self.y = y
         self.speed = speed
+        self.sprites = enemy_assets  # SpriteAtlas with cached flipped/evolved images
         self.frames = enemy_assets[enemy_type]  # Load animation frames
         self.frame_index = 0  # Current frame index
         self.animation_timer = 0  # Timer for animation
-        self.animation_speed = 8  # Speed of animation
         self.image = self.frames[self.frame_index]  # Current image
         self.rect = self.image.get_rect(center=(self.x, self.y))  # Enemy's rectangle
         self.enemy_type = enemy_type  # Type of enemy
         self.facing_left = False  # Direction the enemy is facing
+        self.low_detail = False  # Set by the game's LOD pass: no bars, stars or animation
 
         # Knockback properties
         self.knockback_dx = 0  # Knockback direction (x)
@@ -24,8 +32,8 @@ class Enemy:
 
         # Evolution properties
         self.evolution_level = 0
-        self.time_alive = 0
         self.evolve_threshold = app.FPS * 10  # Evolve every 10 seconds
+        self.evolve_timer = None  # Next evolution, scheduled by the game
         self.size_multiplier = 1.0
         self.original_speed = speed
 
@@ -35,16 +43,13 @@ class Enemy:
 
     def update(self, player):
         try:
-            self.time_alive += 1
-            if self.time_alive >= self.evolve_threshold:
-                self.evolve()
-
             self.apply_knockback()
 
             if self.knockback_dist_remaining <= 0:
                 self.move_toward_player(player)
 
-            self.animate()
+            if not self.low_detail:
+                self.animate()
         except Exception as e:
             print(f"Enemy update error: {e}")
             return False
@@ -81,94 +86,73 @@ class Enemy:
             self.animation_timer = 0
             self.frame_index = (self.frame_index + 1) % len(self.frames)  # Loop frames
             center = self.rect.center  # Save current center
-            self.image = self.frames[self.frame_index]  # Update image
+            self.image = self.current_image()  # Update image, keeping evolution size/tint
             self.rect = self.image.get_rect()  # Update rectangle
             self.rect.center = center  # Restore center
 
     def evolve(self):
         try:
             self.evolution_level += 1
-            self.time_alive = 0
-            
+            speed_factor, self.size_multiplier, _ = self.evolution[min(self.evolution_level, len(self.evolution) - 1)]
+
             # Increase health with evolution
-            self.max_health += 2
+            self.max_health += app.EVOLUTION_HEALTH_STEP
             self.health = self.max_health
-            
-            # Limit size increase to prevent massive enemies
-            max_size_multiplier = 2.5
-            self.size_multiplier = min(self.size_multiplier + 0.2, max_size_multiplier)
-            
-            # Save center position
-            center = self.rect.center
-            
-            # Create scaled image with error handling
-            try:
-                new_width = int(self.frames[0].get_width() * self.size_multiplier)
-                new_height = int(self.frames[0].get_height() * self.size_multiplier)
-                
-                # Ensure minimum size
-                new_width = max(10, new_width)
-                new_height = max(10, new_height)
-                
-                self.image = pygame.transform.scale(
-                    self.frames[self.frame_index],
-                    (new_width, new_height)
-                )
-            except Exception:
-                # Fallback to original image if scaling fails
-                self.image = self.frames[self.frame_index]
-            
-            self.rect = self.image.get_rect(center=center)
-            
-            # Cap speed increase
-            max_speed = self.original_speed * 3
-            self.speed = min(self.original_speed * (1 + self.evolution_level * 0.15), max_speed)
-            
-            # Add color tint
-            if self.image.get_size()[0] > 0 and self.image.get_size()[1] > 0:
-                tint_surface = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                if self.evolution_level == 1:
-                    tint_surface.fill((255, 0, 0, 100))
-                elif self.evolution_level == 2:
-                    tint_surface.fill((128, 0, 128, 100))
-                else:
-                    tint_surface.fill((255, 215, 0, 100))
-                
-                self.image.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            self.speed = self.original_speed * speed_factor
+
+            self.evolve_image()  # Pre-built by the atlas
         except Exception as e:
             print(f"Evolution error: {e}")
             # Reset to safe state
             self.speed = self.original_speed
             self.image = self.frames[0]
-            self.rect = self.image.get_rect(center=center)
+            self.rect = self.image.get_rect(center=self.rect.center)
+
+    def evolve_image(self):
+        # Swap to the pre-built image for the current evolution level
+        center = self.rect.center
+        self.image = self.current_image()
+        self.rect = self.image.get_rect(center=center)
+
+    def current_image(self, facing_left=False):
+        return self.sprites.image(self.enemy_type, self.frame_index, facing_left,
+                                  self.evolution_level, self.size_multiplier)
 
     def draw(self, surface):
-        # Draw the enemy on the screen
-        if self.facing_left:
-            flipped_image = pygame.transform.flip(self.image, True, False)  # Flip image
-            surface.blit(flipped_image, self.rect)
-        else:
-            surface.blit(self.image, self.rect)
-
-        # Add evolution level indicator
+        # Draw the enemy on the screen (flipped images come pre-built from the atlas)
+        surface.blits(self.draw_items(), doreturn=False)
+
+    def draw_items(self):
+        # (surface, dest) pairs: sprite, evolution stars, health bar
+        items = [(self.current_image(self.facing_left), self.rect)]
+        if self.evolution_level > 0:
+            items.append(self.stars_item())
+        items.append(self.health_bar_item())
+        return items
+
+    def queue_draw(self, queue):
+        queue.add("enemies", self.current_image(self.facing_left), self.rect)
+        if self.low_detail:
+            return
         if self.evolution_level > 0:
-            star_color = (255, 255, 0)  # Yellow
-            for i in range(self.evolution_level):
-                x = self.rect.right - 5 - (i * 8)
-                y = self.rect.top - 5
-                pygame.draw.circle(surface, star_color, (x, y), 3)
-
-        # Draw health bar
-        health_ratio = self.health / self.max_health
-        bar_width = self.rect.width
-        bar_height = 4
-        bar_pos = (self.rect.x, self.rect.y - 8)
-        
-        # Background (red)
-        pygame.draw.rect(surface, (255, 0, 0), (*bar_pos, bar_width, bar_height))
-        # Foreground (green)
-        pygame.draw.rect(surface, (0, 255, 0), 
-                        (*bar_pos, bar_width * health_ratio, bar_height))
+            queue.add("enemy_stars", *self.stars_item())
+        queue.add("enemy_bars", *self.health_bar_item())
+
+    def stars_item(self):
+        level = self.evolution_level
+        return app.evolution_stars(level), (self.rect.right - 8 * level, self.rect.top - 8)
+
+    def health_bar_item(self):
+        bar = app.health_bar(self.rect.width, self.health, self.max_health)
+        return bar, (self.rect.x, self.rect.y - 8)
+
+    def draw_bounds(self):
+        # Sprite plus the health bar and evolution stars drawn above it
+        if self.low_detail:
+            return self.rect.copy()
+        left = min(self.rect.left, self.rect.right - 8 * self.evolution_level)
+        top = self.rect.top - 8
+        return pygame.Rect(left, top, self.rect.right - left, self.rect.bottom - top)
 
     def set_knockback(self, px, py, dist):
         # Set knockback direction and distance
@@ -183,4 +167,11 @@ class Enemy:
 
     def take_damage(self, damage):
         self.health -= damage
-        return self.health <= 0
\ No newline at end of file
+        return self.health <= 0
+
+class Enemy(EnemyBase):
+    """Enemy with its state held in its own slots."""
+    __slots__ = ("x", "y", "speed", "sprites", "frames", "frame_index", "animation_timer", "image", "rect",
+                 "enemy_type", "facing_left", "knockback_dx", "knockback_dy", "knockback_dist_remaining",
+                 "evolution_level", "evolve_timer", "evolve_threshold", "size_multiplier", "original_speed",
+                 "max_health", "health", "low_detail", "entity_id")
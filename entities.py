@@ -0,0 +1,69 @@
+# entities.py
+import itertools
+
+_ids = itertools.count(1)  # Shared so an id is unique across every registry
+
+class EntityRegistry(list):
+    """Dense list of live entities with stable ids and deferred, O(1) removal.
+
+    Iterate and index it like a list. Remove entities with despawn(); they stay in place
+    until flush(), which swap-pops each one and hands it to release (e.g. a pool).
+    Entities need a writable entity_id attribute.
+    """
+
+    def __init__(self, release=None):
+        super().__init__()
+        self.release = release
+        self.slots = {}    # entity_id -> index in the list
+        self.pending = {}  # entity_id -> entity, despawned but not yet flushed
+
+    def add(self, entity):
+        entity.entity_id = next(_ids)
+        self.slots[entity.entity_id] = len(self)
+        super().append(entity)
+        return entity.entity_id
+
+    append = add
+
+    def extend(self, entities):
+        for entity in entities:
+            self.add(entity)
+
+    def get(self, entity_id):
+        slot = self.slots.get(entity_id)
+        return None if slot is None else self[slot]
+
+    def despawn(self, entity):
+        if entity.entity_id in self.slots:
+            self.pending[entity.entity_id] = entity
+
+    def is_alive(self, entity):
+        entity_id = entity.entity_id
+        return entity_id in self.slots and entity_id not in self.pending
+
+    def flush(self):
+        """Remove everything despawned since the last flush. Returns how many were removed."""
+        if not self.pending:
+            return 0
+        slots = self.slots
+        release = self.release
+        for entity_id, entity in self.pending.items():
+            # Move the last entity into the freed slot
+            slot = slots.pop(entity_id)
+            last = super().pop()
+            if last is not entity:
+                self[slot] = last
+                slots[last.entity_id] = slot
+            if release is not None:
+                release(entity)
+        removed = len(self.pending)
+        self.pending = {}
+        return removed
+
+    def clear(self):
+        if self.release is not None:
+            for entity in self:
+                self.release(entity)
+        super().clear()
+        self.slots = {}
+        self.pending = {}
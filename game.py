@@ -1,51 +1,168 @@
 import pygame
+import queue
 import random
 import os
+import threading
+import time
+from collections import Counter
 
 import app
 from player import Player
 from enemy import Enemy
-from coin import Coin
+from boss import Boss
+from coin import coin_pool
+from bullet import bullet_pool
+from powerup import PowerUp
+from spatial import SpatialHash
+from entities import EntityRegistry
+from background import Camera, ChunkedBackground
+from hud import GlyphAtlas
+from render import RenderQueue
+from snapshot import HudState, SnapshotBuffer, WorldSnapshot
+from profiler import FrameProfiler, NullProfiler
+from swarm import EnemySwarm, swarm_available
+from replay import ReplayRecorder
+from inputs import KeyState, MOVEMENT_KEYS
+from scheduler import Scheduler
 
 class Game:
-    def __init__(self):
+    def __init__(self, use_swarm=False, headless=False, seed=None, input_source=None, dirty_rects=False,
+                 profile=False, profile_path=None, record_path=None, render_fps=app.FPS, threaded=False,
+                 world_size=None):
+        # Headless mode: no real window, no drawing, no frame cap. Drive it with step().
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+        # All gameplay randomness goes through this so a seed reproduces a session.
+        # Always pick a concrete seed so recordings can store it.
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+
+        # Everything lives in world coordinates; cameras map the part around the player to the screen
+        self.world = pygame.Rect(0, 0, *(world_size or (app.WORLD_WIDTH, app.WORLD_HEIGHT)))
+        # The simulation's view, for spawning around the screen and mapping mouse clicks
+        self.camera = Camera(app.WIDTH, app.HEIGHT, self.world.width, self.world.height)
+        # What's on screen: follows the drawn (interpolated) player
+        self.view_camera = Camera(app.WIDTH, app.HEIGHT, self.world.width, self.world.height)
+
+        # Threaded mode (see run_threaded) simulates on a second thread. The keyboard is read
+        # on the main thread and handed over, since SDL input belongs to the main thread.
+        self.threaded = threaded
+        self.live_keys = None
+        if threaded and input_source is None:
+            self.live_keys = KeyState()
+            input_source = self.live_keys.get_pressed
+
+        # Callable returning the key state, defaults to pygame.key.get_pressed
+        self.input_source = input_source
+
+        # Optional replay log of every input the simulation sees, saved to record_path on exit
+        self.recorder = None
+        self.record_path = record_path
+        if record_path:
+            self.recorder = ReplayRecorder(self.seed, self.world.size)
+            self.input_source = self.recorder.wrap_input(input_source or pygame.key.get_pressed)
+
+        # Opt-in frame profiler (F3 toggles its overlay). Exported to profile_path on quit.
+        self.profiler = FrameProfiler() if profile else NullProfiler()
+        self.profile_path = profile_path
+
+        # Called with the upgrade options when step() hits the level-up menu
+        self.choose_upgrade = None
+        self.tick = 0
+
         pygame.init()
         self.screen = pygame.display.set_mode((app.WIDTH, app.HEIGHT))
         pygame.display.set_caption("Shooter")
         self.clock = pygame.time.Clock()
 
+        # Rendering runs at its own rate (0 = uncapped); the sim always runs at app.FPS ticks per second
+        self.render_fps = render_fps
+        # Rect centres from before the latest tick, for drawing between ticks
+        self.prev_positions = {}
+        self.prev_player_pos = None
+
         self.assets = app.load_assets()
 
         font_path = os.path.join("assets", "PressStart2P.ttf")
         self.font_small = pygame.font.Font(font_path, 10)
         self.font_large = pygame.font.Font(font_path, 32)
-
-        self.background = self.create_random_background(
-            app.WIDTH, app.HEIGHT, self.assets["floor_tiles"]
-        )
+        # Each glyph rasterised once per color; strings are batched blits of cached glyphs
+        self.text_small = GlyphAtlas(self.font_small)
+        self.text_large = GlyphAtlas(self.font_large)
+
+        # Dirty-rect rendering: push only changed regions instead of flipping the whole display
+        self.dirty_rects = dirty_rects
+        self.prev_dirty = []
+        self.hud_rects = []
+        self.full_redraw = True
+
+        # Entity sprites are queued per layer and submitted with one Surface.blits each
+        self.render_queue = RenderQueue()
+        self.visible_bounds = []  # Draw bounds of the enemies on screen in the last draw; the rest are culled
+
+        # Level of detail for big swarms (threshold None turns it off)
+        self.lod_threshold = app.LOD_ENEMY_THRESHOLD
+        self.lod_distance = app.LOD_DISTANCE
+        self.lod_crowding = app.LOD_CROWDING
+        self.lod_interval = app.LOD_INTERVAL
+        self.lod_timer = 0
+        self.lod_active = False
+
+        # Translucent overlays (freeze, menus, shield) built once and reused
+        self.overlays = {}
+
+        # Floor is generated in chunks around the camera, so the world can outgrow the window
+        self.background_layer = ChunkedBackground(self.assets["floor_tiles"], seed=self.rng.getrandbits(32))
+        self.background = self.background_layer.view(self.view_camera.rect)
 
         self.running = True
         self.game_over = False
 
-        self.enemies = []
+        # Entities live in registries: O(1) add, despawn during the tick, flush once at the end
+        self.enemies = EntityRegistry(release=self.release_enemy)
+        self.object_enemies = {}  # entity_id -> enemy not in the swarm (bosses, or all of them without numpy)
         self.enemy_spawn_timer = 0
         self.enemy_spawn_interval = 60
         self.enemies_per_spawn = 1
-
-        self.coins = []
+        self.enemy_evolve_threshold = app.FPS * 10  # Ticks between enemy evolutions
+        # Spatial index over enemies, shared by collisions and auto-aim. Rebuilt lazily,
+        # at most once per change to enemy positions or the enemy list.
+        self.enemy_grid = SpatialHash()
+        self.enemy_grid_dirty = True
+        self.near_bullets_grid = SpatialHash()  # Just the enemies near a bullet, when bullets are few
+
+        # Optional NumPy backend that moves all regular enemies in one batch
+        self.swarm = None
+        if use_swarm:
+            if swarm_available():
+                self.swarm = EnemySwarm()
+            else:
+                print("numpy not installed, using per-enemy updates")
+
+        self.coins = EntityRegistry(release=coin_pool.release)
+        self.player = None
+
+        # Timers fire from a heap when due instead of being counted down every tick.
+        # Enemy evolution runs on its own clock, which stops while time is frozen.
+        self.scheduler = Scheduler()
+        self.enemy_clock = Scheduler()
+        self.evolving = []  # Enemies due to evolve this tick, evolved together as one batch
 
         self.reset_game()
         self.in_level_up_menu = False
         self.upgrade_options = []
 
         self.time_freeze_active = False
-        self.time_freeze_timer = 0
-        self.time_freeze_cooldown = 0  # Cooldown timer for time freeze
+        self.time_freeze_end = None  # Scheduled end of the active freeze
+        self.time_freeze_ready_tick = 0  # Tick the freeze can be used again
         self.time_freeze_color = (0, 255, 255, 50)  # Light cyan with transparency
 
         self.shield_active = False
-        self.shield_timer = 0
-        self.shield_cooldown = 0  # Cooldown timer for the shield
+        self.shield_end = None
+        self.shield_ready_tick = 0
 
         self.boss_spawn_level = 5  # Spawn boss every 5 levels
         self.combo_count = 0
@@ -55,231 +172,678 @@ class Game:
         self.power_up_spawn_timer = 0
         self.power_up_spawn_interval = app.FPS * 15  # Spawn power-up every 15 seconds
 
+        # Balance knobs, exposed so batch runs can sweep them
+        self.level_xp_factor = 15  # XP for the next level is level^2 * this
+        self.upgrade_caps = {"bullet_size": 50, "bullet_speed": 20, "bullet_count": 5, "shoot_cooldown": 5}
+        self.knockback_radius = None  # Only enemies this close are pushed when the player is hit; None for all
+
     def reset_game(self):
-        self.player = Player(app.WIDTH // 2, app.HEIGHT // 2, self.assets)
-        self.enemies = []
+        # Hand the previous round's bullets and coins back to their pools
+        if self.player is not None:
+            self.player.bullets.clear()
+        self.coins.clear()
+        self.prev_positions = {}
+        self.prev_player_pos = None
+
+        self.player = Player(self.world.centerx, self.world.centery, self.assets, self.input_source,
+                             self.scheduler, bounds=self.world)
+        self.camera.follow(*self.player.rect.center)
+        self.enemies.clear()
+        self.enemy_grid_dirty = True
         self.enemy_spawn_timer = 0
         self.enemies_per_spawn = 1
 
-        self.coins = []
+        self.kills = 0
         self.game_over = False
 
-    def create_random_background(self, width, height, floor_files):
-        bg = pygame.Surface((width, height))
-        tile_w = floor_files[0].get_width()
-        tile_h = floor_files[0].get_height()
+    def run(self):
+        if self.threaded and not self.headless:
+            self.run_threaded()
+            return
+
+        profiler = self.profiler
+        recorder = self.recorder
+        tick_seconds = 1.0 / app.FPS
+        accumulator = 0.0
+        self.clock.tick()  # Don't count start-up time as elapsed game time
+        try:
+            while self.running:
+                if self.headless:
+                    ticks = 1  # As fast as possible, one tick per loop
+                else:
+                    # Fixed-rate sim, variable-rate render: bank real time and spend it in whole ticks
+                    accumulator += min(self.clock.tick(self.render_fps) / 1000.0, app.MAX_FRAME_TIME)
+                    ticks = int(accumulator / tick_seconds)
+                    accumulator -= ticks * tick_seconds
+
+                profiler.begin_frame()
+                with profiler.section("events"):
+                    self.handle_events()
+
+                for i in range(ticks):
+                    if not self.game_over and not self.in_level_up_menu:
+                        if i == ticks - 1 and not self.headless:
+                            self.capture_positions()
+                        self.update()
+                        self.tick += 1
+                    else:
+                        self.prev_positions = {}  # Paused, so draw things where they are
+                        self.prev_player_pos = None
+                    if recorder:
+                        recorder.end_frame()  # Events handled so far belong to this tick
+
+                if not self.headless and not self.game_over:
+                    with profiler.section("draw"):
+                        self.draw(accumulator / tick_seconds)
+                profiler.end_frame(self.entity_counts() if profiler.enabled else None)
+        finally:
+            # Keep the recording even if the session crashed, that's when it's most useful
+            self.save_recording()
+
+        if profiler.enabled and self.profile_path:
+            profiler.export(self.profile_path)
+        pygame.quit()
 
-        for y in range(0, height, tile_h):
-            for x in range(0, width, tile_w):
-                tile = random.choice(floor_files)
-                bg.blit(tile, (x, y))
+    def run_threaded(self):
+        """Like run(), but update() runs on a simulation thread and this one only handles events and draws.
+
+        Each frame draws the newest WorldSnapshot the simulation has published. pygame
+        releases the GIL while blitting and flipping, so the next tick is simulated while
+        the frame is drawn. Frames show whole ticks: no interpolation and no dirty rects.
+        """
+        events = queue.SimpleQueue()
+        buffer = SnapshotBuffer()
+        sim = threading.Thread(target=self.simulate, args=(buffer, events), name="simulation", daemon=True)
+        sim.start()
+        try:
+            while self.running:
+                for event in pygame.event.get():
+                    events.put(event)
+                if self.live_keys is not None:
+                    pressed = pygame.key.get_pressed()
+                    self.live_keys.set([key for key in MOVEMENT_KEYS if pressed[key]])
+
+                snapshot = buffer.take(timeout=0.1)
+                if snapshot is not None and not snapshot.hud.game_over:
+                    self.draw_snapshot(snapshot)
+                self.clock.tick(self.render_fps)
+        finally:
+            self.running = False
+            sim.join()
+            self.save_recording()
+
+        if self.profiler.enabled and self.profile_path:
+            self.profiler.export(self.profile_path)
+        pygame.quit()
 
-        return bg
+    def simulate(self, buffer, events):
+        # Simulation thread for run_threaded(): fixed-rate ticks, and a snapshot whenever the renderer wants one.
+        # The profiler is only used from this thread, so its frames are ticks.
+        profiler = self.profiler
+        recorder = self.recorder
+        tick_seconds = 1.0 / app.FPS
+        next_tick = time.perf_counter()
+        try:
+            while self.running:
+                profiler.begin_frame()
+                with profiler.section("events"):
+                    while not events.empty():
+                        self.process_event(events.get())
 
-    def run(self):
-        while self.running:
-            self.clock.tick(app.FPS)
-            self.handle_events()
+                if not self.game_over and not self.in_level_up_menu:
+                    self.update()
+                    self.tick += 1
+                if recorder:
+                    recorder.end_frame()  # Events handled so far belong to this tick
+
+                if buffer.wanted:
+                    with profiler.section("snapshot"):
+                        buffer.publish(self.snapshot())
+                profiler.end_frame(self.entity_counts() if profiler.enabled else None)
+
+                # Hold the tick rate; after a long stall slow down rather than burst to catch up
+                next_tick += tick_seconds
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -app.MAX_FRAME_TIME:
+                    next_tick = time.perf_counter()
+        except Exception as e:
+            print(f"Simulation error: {e}")
+        finally:
+            self.running = False
+
+    def snapshot(self):
+        # Immutable copy of what draw_frame() would show for the current tick
+        camera = self.camera
+        render_queue = RenderQueue()
+        self.queue_world(render_queue, camera.rect)
+        return WorldSnapshot(self.tick, camera.offset, render_queue.snapshot(camera.offset), self.hud_state())
+
+    def draw_snapshot(self, snapshot):
+        hud = snapshot.hud
+        self.hud_rects = []
+        self.view_camera.x, self.view_camera.y = snapshot.camera
+        self.draw_background(True, hud)
+        for items in snapshot.layers:
+            self.screen.blits(items, doreturn=False)
+        self.draw_hud(hud)
+        pygame.display.flip()
+
+    def save_recording(self):
+        if self.recorder and self.record_path:
+            try:
+                self.recorder.save(self.record_path)
+                print(f"Saved replay {self.record_path} ({self.recorder.frame_count} frames)")
+            except OSError as e:
+                print(f"Replay save error: {e}")
+
+    def play_replay(self, replay, keys, realtime=False):
+        """Feed a recorded session back through the game. keys must be this game's input source."""
+        profiler = self.profiler
+        for held, events in replay.frames:
+            if not self.running:
+                break
+            if realtime:
+                self.clock.tick(app.FPS)
+                # Live input only stops playback (close the window or ESC); the replay drives the game
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        self.running = False
+                if not self.running:
+                    break
+            keys.set(held)
+            profiler.begin_frame()
+            with profiler.section("events"):
+                for event in events:
+                    if isinstance(event, tuple):
+                        self.select_upgrade(event[1])
+                    else:
+                        self.process_event(event)
 
             if not self.game_over:
                 if not self.in_level_up_menu:
                     self.update()
-                self.draw()
-
-        pygame.quit()
+                    self.tick += 1
+                if realtime:
+                    with profiler.section("draw"):
+                        self.draw()
+            profiler.end_frame(self.entity_counts() if profiler.enabled else None)
+
+        if profiler.enabled and self.profile_path:
+            profiler.export(self.profile_path)
+
+    def entity_counts(self):
+        counts = {
+            "enemies": len(self.enemies),
+            "bullets": len(self.player.bullets),
+            "coins": len(self.coins),
+            "power_ups": len(self.power_ups),
+        }
+        for name, pool in (("bullet_pool", bullet_pool), ("coin_pool", coin_pool)):
+            for key, value in pool.stats().items():
+                counts[f"{name}_{key}"] = value
+        return counts
+
+    def step(self, n_ticks=1):
+        """Run up to n_ticks fixed simulation steps as fast as possible. Returns ticks run."""
+        ran = 0
+        for _ in range(n_ticks):
+            if self.game_over:
+                break
+            if self.in_level_up_menu:
+                if self.choose_upgrade is None:
+                    break
+                index = self.choose_upgrade(self.upgrade_options)
+                self.select_upgrade(index)
+                if self.in_level_up_menu:
+                    break  # Out-of-range choice: the menu stays open, so don't simulate behind it
+                if self.recorder:
+                    self.recorder.record_upgrade(index)
+
+            self.profiler.begin_frame()
+            self.update()
+            self.profiler.end_frame(self.entity_counts() if self.profiler.enabled else None)
+            if self.recorder:
+                self.recorder.end_frame()
+            self.tick += 1
+            ran += 1
+        return ran
+
+    def select_upgrade(self, index):
+        if 0 <= index < len(self.upgrade_options):
+            upgrade = self.upgrade_options[index]
+            self.apply_upgrade(self.player, upgrade)
+            self.in_level_up_menu = False
 
     def handle_events(self):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if self.game_over:
-                    if event.key == pygame.K_r:
-                        self.reset_game()
-                    elif event.key == pygame.K_ESCAPE:
-                        self.running = False
-                elif self.in_level_up_menu:
-                    # Handle upgrade selection
-                    if event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
-                        index = event.key - pygame.K_1  # 0, 1, 2
-                        if 0 <= index < len(self.upgrade_options):
-                            upgrade = self.upgrade_options[index]
-                            self.apply_upgrade(self.player, upgrade)
-                            self.in_level_up_menu = False
-                else:
-                    # Normal gameplay
-                    if event.key == pygame.K_SPACE:
-                        nearest_enemy = self.find_nearest_enemy()
-                        if nearest_enemy:
-                            self.player.shoot_toward_enemy(nearest_enemy)
-                    if event.key == pygame.K_t:  # Activate time freeze
-                        self.activate_time_freeze()
-                    if event.key == pygame.K_s:  # Activate shield
-                        self.activate_shield()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button
-                    self.player.shoot_toward_mouse(event.pos)
+            self.process_event(event)
+
+    def process_event(self, event):
+        if self.recorder:
+            self.recorder.record_event(event)
+
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                self.profiler.show_overlay = not self.profiler.show_overlay
+            if self.game_over:
+                if event.key == pygame.K_r:
+                    self.reset_game()
+                elif event.key == pygame.K_ESCAPE:
+                    self.running = False
+            elif self.in_level_up_menu:
+                # Handle upgrade selection
+                if event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
+                    index = event.key - pygame.K_1  # 0, 1, 2
+                    self.select_upgrade(index)
+            else:
+                # Normal gameplay
+                if event.key == pygame.K_SPACE:
+                    nearest_enemy = self.find_nearest_enemy()
+                    if nearest_enemy:
+                        self.player.shoot_toward_enemy(nearest_enemy)
+                if event.key == pygame.K_t:  # Activate time freeze
+                    self.activate_time_freeze()
+                if event.key == pygame.K_s:  # Activate shield
+                    self.activate_shield()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # Left mouse button
+                self.player.shoot_toward_mouse(self.camera.to_world(event.pos))
 
     def activate_time_freeze(self):
         if not self.time_freeze_active and self.time_freeze_cooldown <= 0:
             self.time_freeze_active = True
-            self.time_freeze_timer = app.FPS * 5  # Freeze for 5 seconds
-            self.time_freeze_cooldown = app.FPS * 30  # Cooldown for 30 seconds
+            self.time_freeze_end = self.scheduler.call_in(app.FPS * 5, self.end_time_freeze)  # Freeze for 5 seconds
+            self.time_freeze_ready_tick = self.scheduler.now + app.FPS * 30  # Cooldown for 30 seconds
+
+    def end_time_freeze(self):
+        self.time_freeze_active = False
 
     def activate_shield(self):
         if not self.shield_active and self.shield_cooldown <= 0:
             self.shield_active = True
-            self.shield_timer = app.FPS * 5  # Shield lasts for 5 seconds
-            self.shield_cooldown = app.FPS * 20  # Cooldown for 20 seconds
+            self.shield_end = self.scheduler.call_in(app.FPS * 5, self.end_shield)  # Shield lasts for 5 seconds
+            self.shield_ready_tick = self.scheduler.now + app.FPS * 20  # Cooldown for 20 seconds
+
+    def end_shield(self):
+        self.shield_active = False
+
+    # Remaining ticks, derived from the scheduler for the HUD and the activation checks
+    @property
+    def time_freeze_timer(self):
+        return self.scheduler.remaining(self.time_freeze_end)
+
+    @property
+    def time_freeze_cooldown(self):
+        return max(0, self.time_freeze_ready_tick - self.scheduler.now)
+
+    @property
+    def shield_timer(self):
+        return self.scheduler.remaining(self.shield_end)
+
+    @property
+    def shield_cooldown(self):
+        return max(0, self.shield_ready_tick - self.scheduler.now)
 
     def update(self):
+        profiler = self.profiler
         try:
-            # Handle shield logic
-            if self.shield_active:
-                self.shield_timer -= 1
-                if self.shield_timer <= 0:
-                    self.shield_active = False
-                    self.shield_timer = 0
-
-            # Handle time freeze logic
-            if self.time_freeze_active:
-                self.time_freeze_timer -= 1
-                if self.time_freeze_timer <= 0:
-                    self.time_freeze_active = False
-
-            # Handle cooldowns
-            if self.time_freeze_cooldown > 0:
-                self.time_freeze_cooldown -= 1
-            if self.shield_cooldown > 0:
-                self.shield_cooldown -= 1
+            with profiler.section("timers"):
+                self.scheduler.advance()  # Shield and freeze expiry; cooldowns are read off the clock
 
             # Update enemy positions only if not frozen
             if not self.time_freeze_active:
-                for enemy in list(self.enemies):  # Create a copy of the list for iteration
-                    try:
-                        enemy.update(self.player)
-                    except Exception as e:
-                        print(f"Enemy update error: {e}")
-                        if enemy in self.enemies:
-                            self.enemies.remove(enemy)
+                self.enemy_grid_dirty = True
+                with profiler.section("evolution"):
+                    self.enemy_clock.advance()
+                    if self.evolving:
+                        self.evolve_enemies()
+                with profiler.section("enemies"):
+                    if self.swarm is not None:
+                        self.swarm.update(self.player)
+
+                    for enemy in self.enemies:
+                        if enemy.swarm is not None:
+                            continue  # Already moved by the swarm
+                        try:
+                            enemy.update(self.player)
+                        except Exception as e:
+                            print(f"Enemy update error: {e}")
+                            profiler.record_error("enemy_update")
+                            self.enemies.despawn(enemy)
+
+            self.lod_timer -= 1
+            if self.lod_timer <= 0:
+                self.lod_timer = self.lod_interval
+                with profiler.section("lod"):
+                    self.update_lod()
 
             # Update player and game state
-            self.player.handle_input()
-            self.player.update()
-
-            self.check_player_enemy_collisions()
-            self.check_bullet_enemy_collisions()
-            self.check_player_coin_collisions()
+            with profiler.section("player"):
+                self.player.handle_input()
+                self.player.update()
+                self.camera.follow(*self.player.rect.center)
+
+            with profiler.section("player_enemy_collisions"):
+                self.check_player_enemy_collisions()
+            with profiler.section("bullet_enemy_collisions"):
+                self.check_bullet_enemy_collisions()
+            with profiler.section("player_coin_collisions"):
+                self.check_player_coin_collisions()
+            with profiler.section("despawn"):
+                self.flush_despawns()
 
             if self.player.health <= 0:
                 self.game_over = True
                 return
 
-            self.spawn_enemies()
-            self.check_for_level_up()
+            with profiler.section("spawn"):
+                self.spawn_enemies()
+            with profiler.section("level_up"):
+                self.check_for_level_up()
 
         except Exception as e:
             print(f"Update error: {e}")
-
-    def draw(self):
-        self.screen.blit(self.background, (0, 0))
+            profiler.record_error("update")
+
+    def capture_positions(self):
+        # Where moving things are before the tick, so draw() can blend towards where they end up
+        prev = {enemy.entity_id: enemy.rect.center for enemy in self.enemies}
+        prev.update((bullet.entity_id, bullet.rect.center) for bullet in self.player.bullets)
+        self.prev_positions = prev
+        self.prev_player_pos = self.player.rect.center
+
+    def interpolate(self, alpha):
+        # Move rects part way back to their pre-tick centres. Returns (rect, centre) pairs to restore.
+        restore = []
+        if alpha >= 1.0:
+            return restore
+        prev = self.prev_positions
+        if prev:
+            for entities in (self.enemies, self.player.bullets):
+                for entity in entities:
+                    start = prev.get(entity.entity_id)
+                    if start is None:
+                        continue  # Spawned this tick
+                    rect = entity.rect
+                    end = rect.center
+                    if start != end:
+                        restore.append((rect, end))
+                        rect.center = (round(start[0] + (end[0] - start[0]) * alpha),
+                                       round(start[1] + (end[1] - start[1]) * alpha))
+        if self.prev_player_pos is not None:
+            rect = self.player.rect
+            start, end = self.prev_player_pos, rect.center
+            if start != end:
+                restore.append((rect, end))
+                rect.center = (round(start[0] + (end[0] - start[0]) * alpha),
+                               round(start[1] + (end[1] - start[1]) * alpha))
+        return restore
+
+    def draw(self, alpha=1.0):
+        # alpha is how far we are between the previous tick and the latest one
+        restore = self.interpolate(alpha)
+        try:
+            self.draw_frame()
+        finally:
+            for rect, center in restore:
+                rect.center = center
+
+    def draw_frame(self):
+        hud = self.hud_state()
+        # Dirty-rect mode repaints only where things were or are, unless an overlay covers the screen
+        overlay = hud.time_freeze_active or hud.in_level_up_menu or hud.game_over
+        full = not self.dirty_rects or overlay or self.full_redraw
+        self.full_redraw = overlay  # Clear the overlay away on the next frame
+        self.hud_rects = []
+
+        # Scrolling invalidates every dirty rect
+        camera = self.view_camera
+        camera_pos = camera.offset
+        camera.follow(*self.player.rect.center)
+        if camera.offset != camera_pos:
+            full = True
+        self.draw_background(full, hud)
+
+        self.queue_world(self.render_queue, camera.rect)
+        self.render_queue.flush(self.screen, camera.offset)
+
+        self.draw_hud(hud)
+        self.present(full)
+
+    def draw_background(self, full, hud):
+        self.background = self.background_layer.view(self.view_camera.rect)
+        if full:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.prev_dirty:
+                self.screen.blit(self.background, rect, rect)
 
         # Draw time freeze effect
-        if self.time_freeze_active:
-            freeze_overlay = pygame.Surface((app.WIDTH, app.HEIGHT), pygame.SRCALPHA)
-            freeze_overlay.fill(self.time_freeze_color)
-            self.screen.blit(freeze_overlay, (0, 0))
+        if hud.time_freeze_active:
+            self.screen.blit(self.overlay_surface(self.time_freeze_color), (0, 0))
 
-        for coin in self.coins:
-            coin.draw(self.screen)
+    def queue_world(self, queue, view):
+        # Cull everything outside view, a world-space rect, including enemies waiting at the spawn margin
+        queue.extend("coins", [(coin.image, coin.rect) for coin in self.coins if view.colliderect(coin.rect)])
 
         if not self.game_over and not self.in_level_up_menu:
             if self.shield_active:
-                self.draw_shield()  # Draw the shield around the player
-            self.player.draw(self.screen)
+                queue.add("shield", self.shield_surface(), self.shield_rect())  # Shield around the player
+            self.player.queue_draw(queue, view)
 
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
-
-        hp = max(0, min(self.player.health, 5))
-        health_img = self.assets["health"][hp]
-        self.screen.blit(health_img, (10, 10))
+        # Swarm rows are culled and queued from the arrays; only the objects go one by one
+        if self.swarm is not None:
+            self.visible_bounds = self.swarm.queue_draw(queue, view)
+            enemies = self.object_enemies.values()
+        else:
+            self.visible_bounds = []
+            enemies = self.enemies
+        for enemy in enemies:
+            bounds = enemy.draw_bounds()
+            if view.colliderect(bounds):
+                self.visible_bounds.append(bounds)
+                enemy.queue_draw(queue)
+
+    def hud_state(self):
+        player = self.player
+        next_level_xp = player.level * player.level * 5
+        return HudState(
+            health=max(0, min(player.health, 5)),
+            xp=player.xp,
+            xp_to_next=max(0, next_level_xp - player.xp),
+            time_freeze_active=self.time_freeze_active,
+            time_freeze_cooldown=self.time_freeze_cooldown,
+            shield_active=self.shield_active,
+            shield_cooldown=self.shield_cooldown,
+            dash_cooldown=player.dash_cooldown_timer,
+            in_level_up_menu=self.in_level_up_menu,
+            upgrade_options=tuple(self.upgrade_options),
+            game_over=self.game_over,
+            profiler_lines=tuple(self.profiler.overlay_lines()) if self.profiler.show_overlay else (),
+        )
 
-        vp_text_surf = self.font_small.render(f"VP: {self.player.xp}", True, (255, 255, 255))
-        self.screen.blit(vp_text_surf, (10, 70))
+    def draw_hud(self, hud):
+        health_img = self.assets["health"][hud.health]
+        self.blit_hud(health_img, (10, 10))
 
-        next_level_xp = self.player.level * self.player.level * 5
-        xp_to_next = max(0, next_level_xp - self.player.xp)
-        xp_next_surf = self.font_small.render(f"Next Lvl XP: {xp_to_next}", True, (255, 255, 255))
-        self.screen.blit(xp_next_surf, (10, 100))
+        self.draw_text(self.text_small, "VP: ", (255, 255, 255), (10, 70), value=hud.xp)
+        self.draw_text(self.text_small, "Next Lvl XP: ", (255, 255, 255), (10, 100), value=hud.xp_to_next)
 
-        if self.in_level_up_menu:
-            self.draw_upgrade_menu()
+        if hud.in_level_up_menu:
+            self.draw_upgrade_menu(hud.upgrade_options)
 
-        if self.game_over:
+        if hud.game_over:
             self.draw_game_over_screen()
 
-        if self.time_freeze_active:
-            freeze_text = self.font_small.render("Time Freeze Active!", True, (0, 255, 255))
-            self.screen.blit(freeze_text, (app.WIDTH // 2 - 80, 10))
-        elif self.time_freeze_cooldown > 0:
-            cooldown_seconds = self.time_freeze_cooldown // app.FPS
-            cooldown_text = self.font_small.render(f"Time Freeze Cooldown: {cooldown_seconds}s", True, (255, 0, 0))
-            self.screen.blit(cooldown_text, (app.WIDTH // 2 - 100, 10))
+        if hud.time_freeze_active:
+            self.draw_text(self.text_small, "Time Freeze Active!", (0, 255, 255), (app.WIDTH // 2 - 80, 10))
+        elif hud.time_freeze_cooldown > 0:
+            cooldown_seconds = hud.time_freeze_cooldown // app.FPS
+            self.draw_text(self.text_small, "Time Freeze Cooldown: ", (255, 0, 0), (app.WIDTH // 2 - 100, 10),
+                           value=f"{cooldown_seconds}s")
         else:
-            ready_text = self.font_small.render("Time Freeze Ready!", True, (0, 255, 0))
-            self.screen.blit(ready_text, (app.WIDTH // 2 - 80, 10))
-
-        if self.shield_active:
-            shield_text = self.font_small.render("Shield Active!", True, (0, 255, 255))
-            self.screen.blit(shield_text, (app.WIDTH // 2 - 80, 30))
-        elif self.shield_cooldown > 0:
-            cooldown_seconds = self.shield_cooldown // app.FPS
-            cooldown_text = self.font_small.render(f"Shield Cooldown: {cooldown_seconds}s", True, (255, 0, 0))
-            self.screen.blit(cooldown_text, (app.WIDTH // 2 - 100, 30))
+            self.draw_text(self.text_small, "Time Freeze Ready!", (0, 255, 0), (app.WIDTH // 2 - 80, 10))
+
+        if hud.shield_active:
+            self.draw_text(self.text_small, "Shield Active!", (0, 255, 255), (app.WIDTH // 2 - 80, 30))
+        elif hud.shield_cooldown > 0:
+            cooldown_seconds = hud.shield_cooldown // app.FPS
+            self.draw_text(self.text_small, "Shield Cooldown: ", (255, 0, 0), (app.WIDTH // 2 - 100, 30),
+                           value=f"{cooldown_seconds}s")
         else:
-            ready_text = self.font_small.render("Shield Ready!", True, (0, 255, 0))
-            self.screen.blit(ready_text, (app.WIDTH // 2 - 80, 30))
+            self.draw_text(self.text_small, "Shield Ready!", (0, 255, 0), (app.WIDTH // 2 - 80, 30))
 
         # Draw dash cooldown
-        if self.player.dash_cooldown_timer > 0:
-            cooldown_text = self.font_small.render(f"Dash Cooldown: {self.player.dash_cooldown_timer//3}s", True, (255, 0, 0))
-            self.screen.blit(cooldown_text, (app.WIDTH // 2 - 80, 70))
+        if hud.dash_cooldown > 0:
+            self.draw_text(self.text_small, "Dash Cooldown: ", (255, 0, 0), (app.WIDTH // 2 - 80, 70),
+                           value=f"{hud.dash_cooldown//3}s")
         else:
-            ready_text = self.font_small.render("Dash Ready!", True, (0, 255, 0))
-            self.screen.blit(ready_text, (app.WIDTH // 2 - 80, 70))
-
-        pygame.display.flip()
+            self.draw_text(self.text_small, "Dash Ready!", (0, 255, 0), (app.WIDTH // 2 - 80, 70))
+
+        if hud.profiler_lines:
+            self.draw_profiler_overlay(hud.profiler_lines)
+
+    def draw_profiler_overlay(self, lines):
+        y = app.HEIGHT - 14 * len(lines) - 6
+        for line in lines:
+            self.draw_text(self.text_small, line, (255, 255, 0), (10, y))
+            y += 14
+
+    def blit_hud(self, surf, pos):
+        self.hud_rects.append(self.screen.blit(surf, pos))
+
+    def draw_text(self, glyphs, text, color, pos=None, center=None, value=None):
+        # Cached label plus an optional changing value, positioned by top-left or centre
+        if center is not None:
+            width, height = glyphs.size(text)
+            pos = (center[0] - width // 2, center[1] - height // 2)
+        self.hud_rects.append(glyphs.draw(self.screen, text, color, pos, value))
+
+    def collect_dirty_rects(self):
+        # Everything drawn this frame that isn't background, in screen space
+        rects = []
+        if not self.game_over and not self.in_level_up_menu:
+            rects.append(self.player.draw_bounds())
+            if self.shield_active:
+                rects.append(self.shield_rect())
+        rects.extend(bullet.rect.copy() for bullet in self.player.bullets)
+        rects.extend(coin.rect.copy() for coin in self.coins)
+        rects.extend(self.visible_bounds)
+        ox, oy = self.view_camera.offset
+        if ox or oy:
+            rects = [rect.move(-ox, -oy) for rect in rects]
+        return self.hud_rects + rects
+
+    def present(self, full):
+        if not self.dirty_rects:
+            pygame.display.flip()
+            return
+
+        current = self.collect_dirty_rects()
+        dirty = self.prev_dirty + current
+        if full or len(dirty) > app.DIRTY_RECT_LIMIT:
+            # Too many small updates cost more than one flip
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        self.prev_dirty = current
+
+    def shield_surface(self):
+        # Rebuilt only when the player's rect changes size
+        key = ("shield", self.player.rect.size)
+        shield_surface = self.overlays.get(key)
+        if shield_surface is None:
+            shield_surface = pygame.Surface((self.player.rect.width * 2, self.player.rect.height * 2), pygame.SRCALPHA)
+            pygame.draw.circle(shield_surface, (0, 0, 255, 100), (self.player.rect.width, self.player.rect.height), self.player.rect.width)
+            self.overlays[key] = shield_surface
+        return shield_surface
+
+    def overlay_surface(self, color):
+        # Full-screen translucent fill, rebuilt only when the screen size changes
+        key = (self.screen.get_size(), color)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
+            overlay.fill(color)
+            self.overlays[key] = overlay
+        return overlay
+
+    def shield_rect(self):
+        rect = pygame.Rect(0, 0, self.player.rect.width * 2, self.player.rect.height * 2)
+        rect.center = self.player.rect.center
+        return rect
+
+    def update_lod(self):
+        # Past the threshold, enemies far from the player or in crowded cells drop to low detail.
+        # Runs in the sim, not in draw(), so headless runs and replays animate identically.
+        enemies = self.enemies
+        if self.lod_threshold is None or len(enemies) <= self.lod_threshold:
+            if self.lod_active:
+                for enemy in enemies:
+                    enemy.low_detail = False
+                self.lod_active = False
+            return
+        self.lod_active = True
 
-    def draw_shield(self):
-        """Draw a blue shield around the player."""
-        shield_surface = pygame.Surface((self.player.rect.width * 2, self.player.rect.height * 2), pygame.SRCALPHA)
-        pygame.draw.circle(shield_surface, (0, 0, 255, 100), (self.player.rect.width, self.player.rect.height), self.player.rect.width)
-        self.screen.blit(shield_surface, (self.player.rect.centerx - self.player.rect.width, self.player.rect.centery - self.player.rect.height))
+        px, py = self.player.x, self.player.y
+        if self.swarm is not None:
+            self.swarm.mark_far(px, py, self.lod_distance)
+        far2 = self.lod_distance * self.lod_distance
+        others = list(self.object_enemies.values())
+        for enemy in others:
+            dx = enemy.x - px
+            dy = enemy.y - py
+            enemy.low_detail = dx * dx + dy * dy > far2
+
+        # Crowding counts one centre cell per enemy; no need for the collision grid
+        cs = self.enemy_grid.cell_size
+        if self.swarm is not None:
+            crowded = self.swarm.mark_crowded(cs, self.lod_crowding, others)
+        else:
+            cells = [(int(enemy.x // cs), int(enemy.y // cs)) for enemy in others]
+            counts = Counter(cells)
+            crowded = [counts[cell] > self.lod_crowding for cell in cells]
+        for enemy, flag in zip(others, crowded):
+            if flag:
+                enemy.low_detail = True
 
     def spawn_enemies(self):
         self.enemy_spawn_timer += 1
         if self.enemy_spawn_timer >= self.enemy_spawn_interval:
             self.enemy_spawn_timer = 0
 
+            # Just outside the edges of the screen, wherever the camera is
+            view = self.camera.rect
             for _ in range(self.enemies_per_spawn):
-                side = random.choice(['top', 'bottom', 'left', 'right'])
+                side = self.rng.choice(['top', 'bottom', 'left', 'right'])
                 if side == "top":
-                    x = random.randint(0, app.WIDTH)
-                    y = -app.SPAWN_MARGIN
+                    x = view.left + self.rng.randint(0, app.WIDTH)
+                    y = view.top - app.SPAWN_MARGIN
                 elif side == "bottom":
-                    x = random.randint(0, app.WIDTH)
-                    y = app.HEIGHT + app.SPAWN_MARGIN
+                    x = view.left + self.rng.randint(0, app.WIDTH)
+                    y = view.bottom + app.SPAWN_MARGIN
                 elif side == "left":
-                    x = -app.SPAWN_MARGIN
-                    y = random.randint(0, app.HEIGHT)
+                    x = view.left - app.SPAWN_MARGIN
+                    y = view.top + self.rng.randint(0, app.HEIGHT)
                 else:
-                    x = app.WIDTH + app.SPAWN_MARGIN
-                    y = random.randint(0, app.HEIGHT)
+                    x = view.right + app.SPAWN_MARGIN
+                    y = view.top + self.rng.randint(0, app.HEIGHT)
 
-                enemy_type = random.choice(list(self.assets["enemies"].keys()))
-                enemy = Enemy(x, y, enemy_type, self.assets["enemies"])
-                self.enemies.append(enemy)
+                self.enemy_grid_dirty = True
+                enemy_type = self.rng.choice(list(self.assets["enemies"].keys()))
+                if self.swarm is not None:
+                    enemy = self.swarm.spawn(x, y, enemy_type, self.assets["enemies"])
+                else:
+                    enemy = Enemy(x, y, enemy_type, self.assets["enemies"])
+                enemy.evolve_threshold = self.enemy_evolve_threshold
+                self.schedule_evolution(enemy)
+                self.add_enemy(enemy)
 
     def check_player_enemy_collisions(self):
         if self.shield_active:
@@ -293,90 +857,186 @@ class Game:
 
         if collided:
             self.player.take_damage(1)
-            px, py = self.player.x, self.player.y
-            for enemy in self.enemies:
-                enemy.set_knockback(px, py, app.PUSHBACK_DISTANCE)
+            self.knockback_wave(self.player.x, self.player.y, app.PUSHBACK_DISTANCE, self.knockback_radius)
+
+    def knockback_wave(self, px, py, dist, radius=None):
+        # Swarm enemies are pushed in one vectorized pass; the rest (bosses, no numpy) one by one
+        if self.swarm is not None:
+            self.swarm.knockback(px, py, dist, radius)
+        for enemy in self.object_enemies.values():
+            if radius is not None:
+                dx = enemy.x - px
+                dy = enemy.y - py
+                if dx * dx + dy * dy > radius * radius:
+                    continue
+            enemy.set_knockback(px, py, dist)
 
     def draw_game_over_screen(self):
         # Overlay
-        overlay = pygame.Surface((app.WIDTH, app.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 100))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.overlay_surface((0, 0, 0, 100)), (0, 0))
 
         # Game Over Text
-        game_over_surf = self.font_large.render("GAME OVER!", True, (255, 0, 0))
-        game_over_rect = game_over_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 - 50))
-        self.screen.blit(game_over_surf, game_over_rect)
+        self.draw_text(self.text_large, "GAME OVER!", (255, 0, 0), center=(app.WIDTH // 2, app.HEIGHT // 2 - 50))
 
         # Prompt to restart or quit
-        prompt_surf = self.font_small.render("Press R to Play Again or ESC to Quit", True, (255, 255, 255))
-        prompt_rect = prompt_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 + 20))
-        self.screen.blit(prompt_surf, prompt_rect)
+        self.draw_text(self.text_small, "Press R to Play Again or ESC to Quit", (255, 255, 255),
+                       center=(app.WIDTH // 2, app.HEIGHT // 2 + 20))
+
+    def enemy_index(self):
+        # Spatial index over self.enemies, rebuilt only if enemies moved or changed
+        if self.enemy_grid_dirty:
+            self.index_enemies(self.enemy_grid, self.enemy_reach())
+            self.enemy_grid_dirty = False
+        return self.enemy_grid
+
+    def index_enemies(self, grid, reach, near=None):
+        # Bucket enemies by centre cell; near, a set of cells, keeps only the enemies centred in one.
+        # The swarm sorts its cell keys in NumPy, so no per-enemy Python runs for it. The few
+        # others (bosses) stay loose, so their size doesn't widen every query.
+        if self.swarm is not None:
+            grid.load(*self.swarm.grid_order(grid.cell_size, near), reach, self.object_enemies.values())
+            return
+        enemies = self.object_enemies.values()
+        if near is not None:
+            cs = grid.cell_size
+            enemies = [enemy for enemy in enemies if (int(enemy.x // cs), int(enemy.y // cs)) in near]
+        grid.rebuild(enemies, reach)
+
+    def enemy_reach(self):
+        # Furthest a bucketed enemy's rect can reach from its centre cell position
+        if self.swarm is not None:
+            extent = self.swarm.extent()
+        else:
+            extent = max((max(enemy.rect.size) for enemy in self.object_enemies.values()), default=0)
+        return extent // 2 + 2
 
     def find_nearest_enemy(self):
-        if not self.enemies:
-            return None
+        nearest = self.find_nearest_enemies(1)
+        return nearest[0] if nearest else None
 
-        nearest = None
-        min_dist = float('inf')
-        px, py = self.player.x, self.player.y
-
-        for enemy in self.enemies:
-            dist = ((enemy.x - px) ** 2 + (enemy.y - py) ** 2) ** 0.5
-            if dist < min_dist:
-                min_dist = dist
-                nearest = enemy
-
-        return nearest
+    def find_nearest_enemies(self, k, x=None, y=None):
+        # Up to k enemies closest to (x, y), defaulting to the player, nearest first
+        if not self.enemies:
+            return []
+        if x is None:
+            x, y = self.player.x, self.player.y
+        grid = self.enemy_index()
+        return [grid.items[i] for _, i in grid.nearest(x, y, k)]
+
+    def enemies_within(self, radius, x=None, y=None):
+        # Enemies whose centre is within radius of (x, y), defaulting to the player
+        if x is None:
+            x, y = self.player.x, self.player.y
+        grid = self.enemy_index()
+        return [grid.items[i] for i in grid.within(x, y, radius)]
 
     def check_bullet_enemy_collisions(self):
         try:
-            bullets_to_remove = []
+            enemies = self.enemies
+            bullets = self.player.bullets
+            if not enemies or not bullets:
+                return
+
+            spent = bullets.pending
+            live = [bullet for bullet in bullets if bullet.entity_id not in spent]
+            if not live:
+                return
+
+            # Broadphase: only test bullets against enemies in nearby grid cells
+            if self.enemy_grid_dirty and len(live) * app.BULLET_SWEEP_RATIO < len(enemies):
+                # Few bullets: one pass over the enemies keeps only those centred near a bullet
+                grid = self.near_bullets_grid
+                reach = self.enemy_reach()
+                near = set()
+                for bullet in live:
+                    x0, y0, x1, y1 = grid.cell_range(bullet.rect, reach)
+                    near.update((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+                self.index_enemies(grid, reach, near)
+            else:
+                grid = self.enemy_index()
+
+            # Despawned enemies stay in the grid until the end-of-tick flush; skip them
+            dead = enemies.pending
+            slots = enemies.slots
+            items = grid.items
             coins_to_add = []
 
-            # First, gather all collisions
-            for bullet in self.player.bullets:
-                if not hasattr(bullet, 'rect'):
-                    bullets_to_remove.append(bullet)
+            for bullet in live:
+                # Lowest list index first, as a front-to-back scan of self.enemies would
+                best = None
+                for index in grid.hits(bullet.rect):
+                    entity_id = items[index].entity_id
+                    slot = slots[entity_id]
+                    if (best is None or slot < best) and entity_id not in dead:
+                        best = slot
+                if best is None:
                     continue
 
-                for enemy in self.enemies:
-                    if not hasattr(enemy, 'rect'):
-                        continue
-
-                    if bullet.rect.colliderect(enemy.rect):
-                        bullets_to_remove.append(bullet)
-                        # Deal damage instead of instant kill
-                        if enemy.take_damage(1):  # Returns True if enemy dies
-                            self.enemies.remove(enemy)
-                            coins_to_add.append((enemy.x, enemy.y))
-                            self.combo_count += 1
-                            self.combo_timer = self.max_combo_timer
-                            bonus_xp = min(self.combo_count - 1, 3)  # Reduced max bonus XP
-                        break
-
-            # Remove used bullets
-            for bullet in bullets_to_remove:
-                if bullet in self.player.bullets:
-                    self.player.bullets.remove(bullet)
+                bullets.despawn(bullet)
+                enemy = enemies[best]
+                # Deal damage instead of instant kill
+                if enemy.take_damage(1):  # Returns True if enemy dies
+                    enemies.despawn(enemy)  # Adds it to dead
+                    self.kills += 1
+                    coins_to_add.append((enemy.x, enemy.y))
+                    self.combo_count += 1
+                    self.combo_timer = self.max_combo_timer
+                    bonus_xp = min(self.combo_count - 1, 3)  # Reduced max bonus XP
 
             # Add coins for defeated enemies
             for x, y in coins_to_add:
-                self.coins.append(Coin(x, y))
+                self.coins.add(coin_pool.acquire(x, y))
 
         except Exception as e:
             print(f"Collision error: {e}")
 
     def check_player_coin_collisions(self):
-        coins_collected = []
         for coin in self.coins:
             if coin.rect.colliderect(self.player.rect):
-                coins_collected.append(coin)
                 self.player.add_xp(1)
+                self.coins.despawn(coin)
+
+    def flush_despawns(self):
+        # The one place per tick where despawned entities actually leave their registries
+        if self.enemies.flush():
+            self.enemy_grid_dirty = True
+        self.player.bullets.flush()
+        self.coins.flush()
+
+    def add_enemy(self, enemy):
+        self.enemies.add(enemy)
+        if enemy.swarm is None:
+            self.object_enemies[enemy.entity_id] = enemy
+
+    def release_enemy(self, enemy):
+        self.enemy_clock.cancel(enemy.evolve_timer)
+        enemy.evolve_timer = None
+        if enemy.swarm is not None:
+            self.swarm.remove(enemy)
+        else:
+            self.object_enemies.pop(enemy.entity_id, None)
+
+    def schedule_evolution(self, enemy):
+        enemy.evolve_timer = self.enemy_clock.call_in(enemy.evolve_threshold, self.evolving.append, enemy)
 
-        for c in coins_collected:
-            if c in self.coins:
-                self.coins.remove(c)
+    def evolve_enemies(self):
+        # A wave spawned together evolves together: swarm rows in one array pass, the rest
+        # from the same table, with every sprite already built by the atlas
+        due = self.evolving
+        try:
+            if self.swarm is not None:
+                slots = [enemy.slot for enemy in due if enemy.swarm is not None]
+                if slots:
+                    self.swarm.evolve(slots)
+            for enemy in due:
+                if enemy.swarm is None:
+                    enemy.evolve()
+        except Exception as e:
+            print(f"Evolution error: {e}")
+            self.profiler.record_error("evolution")
+        for enemy in due:
+            self.schedule_evolution(enemy)
+        due.clear()
 
     def pick_random_upgrades(self, num):
         possible_upgrades = [
@@ -385,44 +1045,39 @@ class Game:
             {"name": "Extra Bullet",   "desc": "Fire additional bullet"},
             {"name": "Shorter Cooldown", "desc": "Shoot more frequently"},
         ]
-        return random.sample(possible_upgrades, k=num)
+        return self.rng.sample(possible_upgrades, k=num)
 
     def apply_upgrade(self, player, upgrade):
         try:
             name = upgrade["name"]
+            caps = self.upgrade_caps
             if name == "Bigger Bullet":
-                player.bullet_size = min(player.bullet_size + 5, 50)  # Cap bullet size
+                player.bullet_size = min(player.bullet_size + 5, caps["bullet_size"])  # Cap bullet size
             elif name == "Faster Bullet":
-                player.bullet_speed = min(player.bullet_speed + 2, 20)  # Cap bullet speed
+                player.bullet_speed = min(player.bullet_speed + 2, caps["bullet_speed"])  # Cap bullet speed
             elif name == "Extra Bullet":
-                player.bullet_count = min(player.bullet_count + 1, 5)  # Cap bullet count
+                player.bullet_count = min(player.bullet_count + 1, caps["bullet_count"])  # Cap bullet count
             elif name == "Shorter Cooldown":
-                player.shoot_cooldown = max(5, int(player.shoot_cooldown * 0.8))  # Minimum cooldown
+                player.shoot_cooldown = max(caps["shoot_cooldown"], int(player.shoot_cooldown * 0.8))  # Minimum cooldown
         except Exception as e:
             print(f"Upgrade error: {e}")
 
-    def draw_upgrade_menu(self):
+    def draw_upgrade_menu(self, options):
         # Dark overlay behind the menu
-        overlay = pygame.Surface((app.WIDTH, app.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.overlay_surface((0, 0, 0, 180)), (0, 0))
 
         # Title
-        title_surf = self.font_large.render("Choose an Upgrade!", True, (255, 255, 0))
-        title_rect = title_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 3 - 50))
-        self.screen.blit(title_surf, title_rect)
+        self.draw_text(self.text_large, "Choose an Upgrade!", (255, 255, 0), center=(app.WIDTH // 2, app.HEIGHT // 3 - 50))
 
         # Options
-        for i, upgrade in enumerate(self.upgrade_options):
+        for i, upgrade in enumerate(options):
             text_str = f"{i+1}. {upgrade['name']} - {upgrade['desc']}"
-            option_surf = self.font_small.render(text_str, True, (255, 255, 255))
             line_y = app.HEIGHT // 3 + i * 40
-            option_rect = option_surf.get_rect(center=(app.WIDTH // 2, line_y))
-            self.screen.blit(option_surf, option_rect)
+            self.draw_text(self.text_small, text_str, (255, 255, 255), center=(app.WIDTH // 2, line_y))
 
     def check_for_level_up(self):
         # Make leveling much slower
-        xp_needed = self.player.level * self.player.level * 15  # Increased from 5 to 15
+        xp_needed = self.player.level * self.player.level * self.level_xp_factor
         if self.player.xp >= xp_needed:
             self.player.level += 1
             self.in_level_up_menu = True
@@ -436,10 +1091,14 @@ class Game:
                 self.enemies_per_spawn += 1
 
     def spawn_boss(self):
-        x = app.WIDTH // 2
-        y = -50
-        boss = Boss(x, y, "demon", self.assets["enemies"], health=10)
-        self.enemies.append(boss)
+        view = self.camera.rect
+        x = view.centerx
+        y = view.top - 50
+        boss = Boss(x, y, "demon", self.assets["enemies"], health=10, rng=self.rng)
+        boss.evolve_threshold = self.enemy_evolve_threshold
+        self.schedule_evolution(boss)
+        self.add_enemy(boss)
+        self.enemy_grid_dirty = True
 
     def update_combo_timer(self):
         if self.combo_timer > 0:
@@ -454,7 +1113,8 @@ class Game:
             self.spawn_power_up()
 
     def spawn_power_up(self):
-        power_up_type = random.choice(['health', 'speed', 'damage'])
-        x = random.randint(50, app.WIDTH - 50)
-        y = random.randint(50, app.HEIGHT - 50)
+        power_up_type = self.rng.choice(['health', 'speed', 'damage'])
+        view = self.camera.rect
+        x = view.left + self.rng.randint(50, app.WIDTH - 50)
+        y = view.top + self.rng.randint(50, app.HEIGHT - 50)
         self.power_ups.append(PowerUp(x, y, power_up_type))
\ No newline at end of file
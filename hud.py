@@ -0,0 +1,102 @@
+# hud.py
+from collections import OrderedDict
+
+import pygame
+
+class GlyphAtlas:
+    """Cached text for one fixed-width font (PressStart2P), laid out on a shared baseline.
+
+    Fixed labels are rasterised once as whole lines. Changing values (scores, cooldown
+    seconds) are composed from per-glyph surfaces into their own small cache, so a new
+    number never goes through FreeType or pushes labels out of the line cache.
+    Assumes no kerning.
+    """
+
+    def __init__(self, font, line_capacity=128, value_capacity=64):
+        self.font = font
+        self.glyphs = {}  # color -> {char: (surface, dx, dy, advance)}
+        # (text, color) -> (surface, dy, advance), least recently used first
+        self.lines = OrderedDict()
+        self.values = OrderedDict()
+        self.line_capacity = line_capacity
+        self.value_capacity = value_capacity
+        self.ascent = font.get_ascent()
+
+        # Common baseline and line height over printable ASCII, so a line of text never
+        # shifts by a pixel depending on which characters it happens to contain
+        metrics = [m for m in font.metrics("".join(chr(c) for c in range(32, 127))) if m]
+        self.baseline = max([self.ascent] + [m[3] for m in metrics])
+        self.height = self.baseline - min([font.get_descent()] + [m[2] for m in metrics])
+
+    def top_offset(self, text):
+        # FreeType starts a render at the tallest glyph's top; move it onto the shared baseline
+        tops = [m[3] for m in self.font.metrics(text) if m]
+        return self.baseline - max([self.ascent] + tops)
+
+    def glyph(self, char, color):
+        glyphs = self.glyphs.get(color)
+        if glyphs is None:
+            glyphs = self.glyphs[color] = {}
+        glyph = glyphs.get(char)
+        if glyph is None:
+            surf = self.font.render(char, True, color)
+            metrics = self.font.metrics(char)[0]
+            if metrics is None:  # Not in the font, FreeType draws a placeholder box
+                glyph = (surf, 0, 0, surf.get_width())
+            else:
+                # Single-glyph renders start at the glyph's left overhang
+                glyph = (surf, min(metrics[0], 0), self.top_offset(char), metrics[4])
+            glyphs[char] = glyph
+        return glyph
+
+    def line(self, text, color):
+        key = (text, color)
+        line = self.lines.get(key)
+        if line is not None:
+            self.lines.move_to_end(key)
+            return line
+        line = (self.font.render(text, True, color), self.top_offset(text), self.font.size(text)[0])
+        self.lines[key] = line
+        if len(self.lines) > self.line_capacity:
+            self.lines.popitem(last=False)  # Evict least recently used
+        return line
+
+    def value(self, text, color):
+        # Like line(), but composed from cached glyphs instead of rendered by FreeType
+        key = (text, color)
+        value = self.values.get(key)
+        if value is not None:
+            self.values.move_to_end(key)
+            return value
+
+        items = []
+        x = 1  # Room for a glyph overhanging to the left
+        for char in text:
+            glyph, dx, dy, advance = self.glyph(char, color)
+            items.append((glyph, (x + dx, dy)))
+            x += advance
+        surf = pygame.Surface((x + 1, self.height), pygame.SRCALPHA)
+        surf.blits(items, doreturn=False)
+        value = (surf, -1, x - 1)
+        self.values[key] = value
+        if len(self.values) > self.value_capacity:
+            self.values.popitem(last=False)
+        return value
+
+    def size(self, text):
+        return self.font.size(text)[0], self.height
+
+    def draw(self, surface, text, color, pos, value=None):
+        """Blit text with its top-left at pos, followed by value. Returns the rect covered."""
+        x, y = pos
+        items = []
+        if text:
+            line, dy, advance = self.line(text, color)
+            items.append((line, (x, y + dy)))
+            x += advance
+        if value is not None:
+            composed, dx, advance = self.value(str(value), color)
+            items.append((composed, (x + dx, y)))
+            x += advance
+        surface.blits(items, doreturn=False)
+        return pygame.Rect(pos[0], pos[1], x - pos[0], self.height)
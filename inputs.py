@@ -0,0 +1,26 @@
+# inputs.py
+import pygame
+
+class KeyState:
+    """Stand-in for pygame.key.get_pressed() that code (bots, tests, replays) can press keys on."""
+
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+    def get_pressed(self):
+        return self
+
+    def press(self, key):
+        self.pressed.add(key)
+
+    def release(self, key):
+        self.pressed.discard(key)
+
+    def set(self, keys):
+        self.pressed = set(keys)
+
+# Keys Player.handle_input reads
+MOVEMENT_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_LSHIFT)
@@ -1,12 +1,55 @@
 # main.py
+import argparse
+
+import app
 from game import Game
+import replay
+
+def world_size(text):
+    # "WIDTHxHEIGHT", e.g. 3200x2400
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width < app.WIDTH or height < app.HEIGHT:
+        raise argparse.ArgumentTypeError(f"the world can't be smaller than the {app.WIDTH}x{app.HEIGHT} window")
+    return width, height
 
 def main():
+    parser = argparse.ArgumentParser(description="Shooter")
+    parser.add_argument("--profile", metavar="PATH", nargs="?", const="profile.json",
+                        help="record per-frame timings (F3 toggles overlay); .csv or .json export on quit")
+    parser.add_argument("--render-fps", type=int, default=60,
+                        help="rendered frames per second, 0 for uncapped; the game itself always runs at 60 ticks/s")
+    parser.add_argument("--threaded", action="store_true",
+                        help="simulate on a separate thread from rendering (helps with large swarms)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="update only the changed parts of the screen instead of flipping every frame")
+    parser.add_argument("--swarm", action="store_true",
+                        help="move regular enemies in bulk with NumPy (helps with thousands of enemies)")
+    parser.add_argument("--world", metavar="WxH", type=world_size,
+                        help="size of the scrolling world (default: the window); replays store their own")
+    parser.add_argument("--record", metavar="PATH", help="save a replay of this session to PATH")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded session")
+    parser.add_argument("--fast", action="store_true",
+                        help="with --replay: headless and as fast as possible instead of real time")
+    args = parser.parse_args()
+
+    if args.replay:
+        game = replay.play(args.replay, realtime=not args.fast,
+                           profile=args.profile is not None, profile_path=args.profile, use_swarm=args.swarm,
+                           dirty_rects=args.dirty_rects)
+        print(f"Replay finished at tick {game.tick}: level {game.player.level}, "
+              f"xp {game.player.xp}, health {game.player.health}")
+        return
+
     # Create an instance of the Game class
-    game = Game()
+    game = Game(profile=args.profile is not None, profile_path=args.profile, record_path=args.record,
+                render_fps=args.render_fps, threaded=args.threaded, world_size=args.world,
+                use_swarm=args.swarm, dirty_rects=args.dirty_rects)
     # Start the game loop
     game.run()
 
 if __name__ == "__main__":
     # Run the main function
-    main()
\ No newline at end of file
+    main()
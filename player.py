@@ -1,10 +1,25 @@
 import pygame
 import app
 import math
-from bullet import Bullet
+from bullet import bullet_pool
+from entities import EntityRegistry
+from scheduler import Scheduler
 
 class Player:
-    def __init__(self, x, y, assets):
+    __slots__ = ("x", "y", "speed", "animations", "state", "frame_index", "animation_timer", "image", "rect",
+                 "facing_left", "health", "xp", "bullet_speed", "bullet_size", "bullet_count", "shoot_cooldown",
+                 "last_shot_tick", "bullets", "level", "shooting_laser", "dash_speed", "dash_end_tick",
+                 "dash_ready_tick", "dash_direction", "is_dashing", "input_source", "clock", "bounds")
+
+    # Shared by every player
+    animation_speed = 8
+    dash_duration = 10  # frames
+    dash_cooldown = 45  # frames
+
+    def __init__(self, x, y, assets, input_source=None, clock=None, bounds=None):
+        # Cooldowns are kept as the tick they end on, read against the game's scheduler clock
+        self.clock = clock or Scheduler()
+        self.bounds = bounds or pygame.Rect(0, 0, app.WIDTH, app.HEIGHT)  # The world the player stays in
         self.x = x
         self.y = y
         self.speed = app.PLAYER_SPEED
@@ -12,7 +27,6 @@ class Player:
         self.state = "idle"
         self.frame_index = 0
         self.animation_timer = 0
-        self.animation_speed = 8
         self.image = self.animations[self.state][self.frame_index]
         self.rect = self.image.get_rect(center=(self.x, self.y))
         self.facing_left = False
@@ -22,23 +36,23 @@ class Player:
         self.bullet_size = 10
         self.bullet_count = 1
         self.shoot_cooldown = 20
-        self.shoot_timer = 0
-        self.bullets = []
+        self.last_shot_tick = self.clock.now
+        self.bullets = EntityRegistry(release=bullet_pool.release)  # Despawned bullets go back to the pool
         self.level = 1
         self.shooting_laser = False  # Track if the player is shooting a laser
         self.dash_speed = self.speed * 3
-        self.dash_duration = 10  # frames
-        self.dash_cooldown = 45  # frames
-        self.dash_timer = 0
-        self.dash_cooldown_timer = 0
+        self.dash_end_tick = 0
+        self.dash_ready_tick = 0
         self.dash_direction = [0, 0]
         self.is_dashing = False
+        # Anything shaped like pygame.key.get_pressed, so scripts can drive the player
+        self.input_source = input_source or pygame.key.get_pressed
 
     def handle_input(self):
-        keys = pygame.key.get_pressed()
+        keys = self.input_source()
         
         # Handle dash
-        if keys[pygame.K_LSHIFT] and self.dash_cooldown_timer <= 0 and not self.is_dashing:
+        if keys[pygame.K_LSHIFT] and self.clock.now >= self.dash_ready_tick and not self.is_dashing:
             vel_x = 0
             vel_y = 0
             if keys[pygame.K_LEFT]: vel_x = -1
@@ -51,6 +65,7 @@ class Player:
 
         if self.is_dashing:
             self.update_dash()
+            vel_x, vel_y = self.dash_direction
         else:
             # Normal movement
             vel_x, vel_y = 0, 0
@@ -62,9 +77,10 @@ class Player:
             self.x += vel_x
             self.y += vel_y
 
-        # Clamp player position to screen bounds
-        self.x = max(0, min(self.x, app.WIDTH))
-        self.y = max(0, min(self.y, app.HEIGHT))
+        # Clamp player position to the world bounds
+        bounds = self.bounds
+        self.x = max(bounds.left, min(self.x, bounds.right))
+        self.y = max(bounds.top, min(self.y, bounds.bottom))
         self.rect.center = (self.x, self.y)
 
         # Determine animation state
@@ -79,19 +95,18 @@ class Player:
         elif vel_x > 0:
             self.facing_left = False
 
-    def update(self):
-        # Update dash cooldown
-        if self.dash_cooldown_timer > 0:
-            self.dash_cooldown_timer -= 1
-
-        # Update shoot timer
-        self.shoot_timer += 1
+    @property
+    def dash_cooldown_timer(self):
+        # Cooldown ticks still to run after this one, for the HUD
+        return max(0, self.dash_ready_tick - self.clock.now - 1)
 
-        # Update bullets
+    def update(self):
+        # Update bullets, despawning the ones that left the world (the game flushes them)
+        bounds = self.bounds
         for bullet in self.bullets:
             bullet.update()
-            if bullet.y < 0 or bullet.y > app.HEIGHT or bullet.x < 0 or bullet.x > app.WIDTH:
-                self.bullets.remove(bullet)
+            if bullet.y < bounds.top or bullet.y > bounds.bottom or bullet.x < bounds.left or bullet.x > bounds.right:
+                self.bullets.despawn(bullet)
 
         # Update animation
         self.animation_timer += 1
@@ -105,21 +120,43 @@ class Player:
             self.rect.center = center
 
     def draw(self, surface):
-        if self.facing_left:
-            flipped_img = pygame.transform.flip(self.image, True, False)
-            surface.blit(flipped_img, self.rect)
-        else:
-            surface.blit(self.image, self.rect)
+        if self.is_dashing:
+            self.draw_afterimage(surface)
+
+        surface.blit(self.current_image(), self.rect)
 
         # Draw bullets
-        for bullet in self.bullets:
-            bullet.draw(surface)
+        surface.blits([(bullet.image, bullet.rect) for bullet in self.bullets], doreturn=False)
+
+    def queue_draw(self, queue, view=None):
+        if self.is_dashing:
+            afterimage = self.image.copy()
+            afterimage.set_alpha(100)
+            queue.add("player", afterimage, (self.x - 20, self.y - 20))
+        queue.add("player", self.current_image(), self.rect)
+        if view is None:
+            queue.extend("bullets", [(bullet.image, bullet.rect) for bullet in self.bullets])
+        else:
+            queue.extend("bullets", [(bullet.image, bullet.rect) for bullet in self.bullets
+                                     if view.colliderect(bullet.rect)])
+
+    def current_image(self):
+        # Flipped and see-through (motion blur while dashing) frames come pre-built from the atlas
+        return self.animations.image(self.state, self.frame_index, self.facing_left,
+                                     alpha=180 if self.is_dashing else 255)
+
+    def draw_bounds(self):
+        # Area the player sprite (and dash afterimage) covers, for dirty-rect rendering
+        bounds = self.rect.copy()
+        if self.is_dashing:
+            bounds.union_ip(pygame.Rect(self.x - 20, self.y - 20, *self.image.get_size()))
+        return bounds
 
     def take_damage(self, amount):
         self.health = max(0, self.health - amount)
 
     def shoot_toward_position(self, tx, ty):
-        if self.shoot_timer < self.shoot_cooldown:
+        if self.clock.now - self.last_shot_tick < self.shoot_cooldown:
             return
 
         dx = tx - self.x
@@ -142,10 +179,10 @@ class Player:
             angle = base_angle + spread_radians
             final_vx = math.cos(angle) * self.bullet_speed
             final_vy = math.sin(angle) * self.bullet_speed
-            bullet = Bullet(self.x, self.y, final_vx, final_vy, self.bullet_size)
-            self.bullets.append(bullet)
+            bullet = bullet_pool.acquire(self.x, self.y, final_vx, final_vy, self.bullet_size)
+            self.bullets.add(bullet)
 
-        self.shoot_timer = 0
+        self.last_shot_tick = self.clock.now
 
     def shoot_toward_mouse(self, pos):
         mx, my = pos
@@ -159,29 +196,22 @@ class Player:
 
     def start_dash(self, dx, dy):
         self.is_dashing = True
-        self.dash_timer = self.dash_duration
+        self.dash_end_tick = self.clock.now + self.dash_duration
         self.dash_direction = [dx, dy]
-        # Create a motion blur effect
-        self.image.set_alpha(180)
 
     def update_dash(self):
-        if self.dash_timer > 0:
+        if self.clock.now < self.dash_end_tick:
             # Move quickly in the dash direction
             self.x += self.dash_direction[0] * self.dash_speed
             self.y += self.dash_direction[1] * self.dash_speed
-            self.dash_timer -= 1
-            
-            # Create afterimage effect
-            self.draw_afterimage()
         else:
             self.end_dash()
 
     def end_dash(self):
         self.is_dashing = False
-        self.dash_cooldown_timer = self.dash_cooldown
-        self.image.set_alpha(255)
+        self.dash_ready_tick = self.clock.now + self.dash_cooldown
 
-    def draw_afterimage(self):
+    def draw_afterimage(self, surface):
         # Create a fading copy of the player at their position
         afterimage = self.image.copy()
         afterimage.set_alpha(100)
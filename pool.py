@@ -0,0 +1,33 @@
+# pool.py
+
+class Pool:
+    """Free list of reusable objects. Pooled classes implement reset() with their __init__ args."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+        else:
+            obj = self.factory(*args)
+            self.created += 1
+        return obj
+
+    def release(self, obj):
+        self.released += 1
+        self.free.append(obj)
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "free": len(self.free),
+            "in_use": self.created - len(self.free),
+        }
@@ -1,21 +1,21 @@
-import pygame
+import app
 
 class PowerUp:
+    __slots__ = ("x", "y", "type", "image", "rect")
+
+    size = 20
+    # Different colors for different power-ups
+    colors = {
+        'health': (255, 50, 50),    # Red
+        'speed': (50, 255, 50),     # Green
+        'damage': (50, 50, 255)     # Blue
+    }
+
     def __init__(self, x, y, power_type):
         self.x = x
         self.y = y
         self.type = power_type
-        self.size = 20
-        self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-        
-        # Different colors for different power-ups
-        self.colors = {
-            'health': (255, 50, 50),    # Red
-            'speed': (50, 255, 50),     # Green
-            'damage': (50, 50, 255)     # Blue
-        }
-        
-        self.image.fill(self.colors[power_type])
+        self.image = app.solid_surface(self.size, self.colors[power_type])  # Shared, never drawn on
         self.rect = self.image.get_rect(center=(x, y))
         
     def draw(self, surface):
@@ -0,0 +1,159 @@
+# profiler.py
+import csv
+import json
+import time
+from collections import deque
+
+OVERLAY_LINE_CHARS = 70  # PressStart2P at size 10 is 10px per character
+
+class _Section:
+    # Context manager that adds its elapsed time to the current frame
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+        return False
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SECTION = _NullSection()
+
+class NullProfiler:
+    """Stand-in used when profiling is off, so the game loop pays almost nothing."""
+    enabled = False
+    show_overlay = False
+
+    def begin_frame(self):
+        pass
+
+    def section(self, name):
+        return _NULL_SECTION
+
+    def end_frame(self, counts=None):
+        pass
+
+    def record_error(self, where):
+        pass
+
+class FrameProfiler:
+    """Per-frame section timings, entity counts and rolling frame-time percentiles."""
+    enabled = True
+
+    def __init__(self, history=600):
+        self.frames = deque(maxlen=history)  # One row per frame: section ms + counts
+        self.sections = []  # Section names in first-seen order, for columns and the overlay
+        self.current = {}
+        self.frame_start = 0.0
+        self.frame_count = 0
+        self.errors = {}
+        self.show_overlay = True
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def section(self, name):
+        return _Section(self, name)
+
+    def end_frame(self, counts=None):
+        total = time.perf_counter() - self.frame_start
+        row = {"frame": self.frame_count, "frame_ms": total * 1000}
+        for name, seconds in self.current.items():
+            if name not in self.sections:
+                self.sections.append(name)
+            row[name + "_ms"] = seconds * 1000
+        if counts:
+            row.update(counts)
+        self.frames.append(row)
+        self.frame_count += 1
+
+    def record_error(self, where):
+        self.errors[where] = self.errors.get(where, 0) + 1
+
+    def percentile(self, key, p):
+        values = sorted(row.get(key, 0.0) for row in self.frames)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+    def summary(self):
+        summary = {
+            "frames": self.frame_count,
+            "frame_ms_p50": self.percentile("frame_ms", 0.50),
+            "frame_ms_p99": self.percentile("frame_ms", 0.99),
+            "errors": dict(self.errors),
+            "sections": {},
+        }
+        for name in self.sections:
+            key = name + "_ms"
+            summary["sections"][name] = {
+                "p50": self.percentile(key, 0.50),
+                "p99": self.percentile(key, 0.99),
+            }
+        if self.frames:
+            last = self.frames[-1]
+            summary["last_counts"] = {k: v for k, v in last.items()
+                                      if k != "frame" and not k.endswith("_ms")}
+        return summary
+
+    def overlay_lines(self):
+        # Short text lines for the on-screen overlay
+        if not self.frames:
+            return []
+        lines = [f"frame p50 {self.percentile('frame_ms', 0.5):.1f}ms "
+                 f"p99 {self.percentile('frame_ms', 0.99):.1f}ms"]
+        last = self.frames[-1]
+        for name in self.sections:
+            lines.append(f"{name}: {last.get(name + '_ms', 0.0):.2f}ms")
+        # Counts wrapped so they fit across the screen in the small font
+        line = ""
+        for key, value in last.items():
+            if key == "frame" or key.endswith("_ms"):
+                continue
+            item = f"{key}={value}"
+            if line and len(line) + len(item) + 1 > OVERLAY_LINE_CHARS:
+                lines.append(line)
+                line = item
+            else:
+                line = f"{line} {item}" if line else item
+        if line:
+            lines.append(line)
+        return lines
+
+    def export(self, path):
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def export_csv(self, path):
+        columns = []
+        for row in self.frames:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "frames": list(self.frames)}, f, indent=2)
@@ -0,0 +1,44 @@
+# render.py
+
+# Draw order, back to front
+LAYERS = ("coins", "shield", "player", "bullets", "enemies", "enemy_stars", "enemy_bars")
+
+class RenderQueue:
+    """Collects (surface, dest) pairs per layer and submits each layer with one Surface.blits call."""
+
+    def __init__(self, layers=LAYERS):
+        self.order = layers
+        self.layers = {name: [] for name in layers}
+
+    def add(self, layer, image, dest):
+        self.layers[layer].append((image, dest))
+
+    def extend(self, layer, items):
+        self.layers[layer].extend(items)
+
+    def flush(self, target, offset=(0, 0)):
+        # Dests are in world coordinates; offset is the camera's top-left corner
+        ox, oy = offset
+        for name in self.order:
+            items = self.layers[name]
+            if items:
+                if ox or oy:
+                    target.blits([(image, (dest[0] - ox, dest[1] - oy)) for image, dest in items], doreturn=False)
+                else:
+                    target.blits(items, doreturn=False)
+                items.clear()
+
+    def snapshot(self, offset=(0, 0)):
+        """Empty the queue into a tuple of per-layer item tuples, dests copied off the live rects.
+
+        Dests are moved into screen space by offset, as in flush(). The result no longer
+        changes when the entities move, so another thread can draw it.
+        """
+        ox, oy = offset
+        layers = []
+        for name in self.order:
+            items = self.layers[name]
+            if items:
+                layers.append(tuple([(image, (dest[0] - ox, dest[1] - oy)) for image, dest in items]))
+                items.clear()
+        return tuple(layers)
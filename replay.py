@@ -0,0 +1,132 @@
+# replay.py
+import struct
+import zlib
+
+import pygame
+
+from inputs import KeyState, MOVEMENT_KEYS
+
+# File layout: header, then zlib-compressed frames.
+# Each frame: u8 held-key bitmask, u8 event count, then the events.
+REPLAY_MAGIC = b"SHRP"
+REPLAY_VERSION = 3  # 2: keys widened to u32 for SDL2 keycodes, 3: world size in the header
+HEADER = struct.Struct("<4sHQIII")  # magic, version, seed, frame count, world width, world height
+
+EVENT_KEY = 1      # u32 key (arrows, shift, F-keys are ~1e9 in SDL2)
+EVENT_MOUSE = 2    # u8 button, i16 x, i16 y
+EVENT_UPGRADE = 3  # u8 option index
+
+def keys_to_mask(keys):
+    mask = 0
+    for bit, key in enumerate(MOVEMENT_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+def mask_to_keys(mask):
+    return [key for bit, key in enumerate(MOVEMENT_KEYS) if mask & (1 << bit)]
+
+class ReplayRecorder:
+    """Records the seed plus every input the simulation reads, one frame per loop iteration.
+
+    Events recorded since the last end_frame() belong to the next frame, since the game
+    handles events before it updates.
+    """
+
+    def __init__(self, seed, world_size):
+        self.seed = seed
+        self.world_size = world_size
+        self.data = bytearray()
+        self.frame_count = 0
+        self.keys = 0
+        self.events = bytearray()
+        self.event_count = 0
+
+    def wrap_input(self, source):
+        # Input source that records whatever the player reads from the real one
+        def read():
+            keys = source()
+            self.keys = keys_to_mask(keys)
+            return keys
+        return read
+
+    def end_frame(self):
+        self.data += struct.pack("<BB", self.keys, self.event_count)
+        self.data += self.events
+        self.frame_count += 1
+        self.keys = 0
+        self.events = bytearray()
+        self.event_count = 0
+
+    def record_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            self.events += struct.pack("<BI", EVENT_KEY, event.key)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            x, y = event.pos
+            self.events += struct.pack("<BBhh", EVENT_MOUSE, event.button, x, y)
+        else:
+            return
+        self.event_count += 1
+
+    def record_upgrade(self, index):
+        self.events += struct.pack("<BB", EVENT_UPGRADE, index)
+        self.event_count += 1
+
+    def save(self, path):
+        # Events after the last tick (e.g. the ESC that ended the session) never reached the
+        # simulation, so they are left out; a frame for them would replay one tick too many
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.frame_count, *self.world_size))
+            f.write(zlib.compress(bytes(self.data)))
+
+class Replay:
+    """A loaded recording: the seed, the world size and a list of (held keys, events) frames."""
+
+    def __init__(self, seed, frames, world_size):
+        self.seed = seed
+        self.frames = frames
+        self.world_size = world_size
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            raw = f.read()
+        magic, version, seed, frame_count, world_width, world_height = HEADER.unpack_from(raw, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+        data = zlib.decompress(raw[HEADER.size:])
+
+        frames = []
+        pos = 0
+        for _ in range(frame_count):
+            mask, count = struct.unpack_from("<BB", data, pos)
+            pos += 2
+            events = []
+            for _ in range(count):
+                kind = data[pos]
+                if kind == EVENT_KEY:
+                    (key,) = struct.unpack_from("<I", data, pos + 1)
+                    events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+                    pos += 5
+                elif kind == EVENT_MOUSE:
+                    button, x, y = struct.unpack_from("<Bhh", data, pos + 1)
+                    events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y)))
+                    pos += 6
+                elif kind == EVENT_UPGRADE:
+                    events.append(("upgrade", data[pos + 1]))
+                    pos += 2
+                else:
+                    raise ValueError(f"Unknown replay event {kind} in {path}")
+            frames.append((mask_to_keys(mask), events))
+        return cls(seed, frames, (world_width, world_height))
+
+def play(path, realtime=False, **game_options):
+    """Rebuild the recorded session. Headless and as fast as possible unless realtime=True."""
+    from game import Game  # game imports this module for recording
+
+    replay = Replay.load(path)
+    keys = KeyState()
+    game = Game(headless=not realtime, seed=replay.seed, input_source=keys.get_pressed,
+                world_size=replay.world_size, **game_options)
+    game.play_replay(replay, keys, realtime)
+    return game
@@ -0,0 +1,67 @@
+# scheduler.py
+import heapq
+import itertools
+
+class Timer:
+    # Handle for one scheduled callback
+    __slots__ = ("fire_tick", "callback", "args", "cancelled")
+
+    def __init__(self, fire_tick, callback, args):
+        self.fire_tick = fire_tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+class Scheduler:
+    """Tick clock with a min-heap of pending callbacks.
+
+    Work happens only when a timer is due, so idle timers cost nothing per tick.
+    Cancelled timers stay in the heap until they surface or a compaction drops them.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.heap = []  # (fire_tick, sequence, Timer); sequence keeps same-tick timers in FIFO order
+        self.sequence = itertools.count()
+        self.cancelled = 0
+
+    def call_at(self, tick, callback, *args):
+        timer = Timer(tick, callback, args)
+        heapq.heappush(self.heap, (tick, next(self.sequence), timer))
+        return timer
+
+    def call_in(self, ticks, callback, *args):
+        return self.call_at(self.now + ticks, callback, *args)
+
+    def cancel(self, timer):
+        if timer is None or timer.cancelled:
+            return
+        timer.cancelled = True
+        self.cancelled += 1
+        # Rebuild once dead entries dominate, so churn (enemies dying) can't bloat the heap
+        if self.cancelled > 64 and self.cancelled * 2 > len(self.heap):
+            self.heap = [entry for entry in self.heap if not entry[2].cancelled]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+
+    def remaining(self, timer):
+        # Ticks until timer fires, 0 if it has fired or was cancelled
+        if timer is None or timer.cancelled:
+            return 0
+        return max(0, timer.fire_tick - self.now)
+
+    def advance(self):
+        # Move the clock one tick and run everything now due, earliest first
+        self.now += 1
+        heap = self.heap
+        while heap and heap[0][0] <= self.now:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                self.cancelled -= 1
+                continue
+            timer.cancelled = True  # Fired; remaining() reports 0 from here on
+            timer.callback(*timer.args)
+
+    def clear(self):
+        self.heap = []
+        self.cancelled = 0
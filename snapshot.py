@@ -0,0 +1,44 @@
+# snapshot.py
+import threading
+from collections import namedtuple
+
+# HUD values as of one tick
+HudState = namedtuple("HudState", [
+    "health", "xp", "xp_to_next",
+    "time_freeze_active", "time_freeze_cooldown", "shield_active", "shield_cooldown", "dash_cooldown",
+    "in_level_up_menu", "upgrade_options", "game_over", "profiler_lines",
+])
+
+# Everything the renderer needs from one tick: the camera position, the queued sprite
+# layers in screen space (see RenderQueue.snapshot) and the HUD
+WorldSnapshot = namedtuple("WorldSnapshot", ["tick", "camera", "layers", "hud"])
+
+class SnapshotBuffer:
+    """Double buffer between the simulation thread and the renderer.
+
+    The renderer draws the snapshot it last took (the front buffer) while the simulation
+    publishes the next one into the back slot. The simulation only builds a snapshot when
+    wanted is set, i.e. once the previous one has been taken, so a slow renderer never
+    makes it capture frames that would be thrown away.
+    """
+
+    def __init__(self):
+        self.ready = threading.Condition()
+        self.back = None
+        self.wanted = True
+
+    def publish(self, snapshot):
+        with self.ready:
+            self.back = snapshot
+            self.wanted = False
+            self.ready.notify()
+
+    def take(self, timeout=None):
+        # Newest unread snapshot, or None if none arrives within timeout
+        with self.ready:
+            if self.back is None:
+                self.ready.wait(timeout)
+            snapshot, self.back = self.back, None
+            if snapshot is not None:
+                self.wanted = True
+            return snapshot
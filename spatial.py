@@ -0,0 +1,168 @@
+# spatial.py
+import heapq
+from bisect import bisect_left
+
+# Cell size in pixels. Roughly one enemy sprite wide, so a bullet query spans a few cells.
+DEFAULT_CELL_SIZE = 64
+
+class SpatialHash:
+    """Uniform grid broadphase: buckets items by the cell holding their x, y centre.
+
+    Each item sits in exactly one cell. Rect queries widen by reach, the furthest any item's
+    rect extends from its centre, so items overlapping a cell from a neighbour are still found.
+    Cells are kept sorted by (cx, cy), so a column of cells is one contiguous run of items.
+    A few loose items (e.g. ones far bigger than the rest) can skip the cells; every query
+    checks them directly so they don't widen the reach.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> (start, stop) slice of self.items
+        self.keys = []  # Occupied cells, sorted
+        self.starts = [0]  # starts[i] is where keys[i]'s items begin; the last entry closes the run
+        self.items = []  # Grouped so each cell's items are contiguous
+        self.rects = []  # items[i].rect, for collidelistall
+        self.loose_start = 0  # items from here on are loose
+        self.reach = 0
+        self.bounds = None  # (min_cx, min_cy, max_cx, max_cy) of occupied cells
+
+    def cell_range(self, rect, reach=0):
+        # Inclusive range of cells covered by a rect grown by reach on every side
+        cs = self.cell_size
+        x0 = (rect.left - reach) // cs
+        y0 = (rect.top - reach) // cs
+        x1 = (max(rect.left, rect.right - 1) + reach) // cs
+        y1 = (max(rect.top, rect.bottom - 1) + reach) // cs
+        return x0, y0, x1, y1
+
+    def rebuild(self, items, reach=None):
+        # Enemies move every tick, so a full rebuild is cheaper than tracking moves.
+        # One dict lookup per item; reach defaults to half the largest rect side.
+        cs = self.cell_size
+        groups = {}
+        for item in items:
+            cell = (int(item.x // cs), int(item.y // cs))
+            group = groups.get(cell)
+            if group is None:
+                groups[cell] = [item]
+            else:
+                group.append(item)
+
+        cells = sorted(groups)
+        ordered = []
+        starts = []
+        for cell in cells:
+            starts.append(len(ordered))
+            ordered.extend(groups[cell])
+        if reach is None:
+            reach = max((max(item.rect.size) for item in ordered), default=0) // 2 + 2
+        self.load(ordered, cells, starts, reach)
+
+    def load(self, items, cells, starts, reach, loose=()):
+        # Items already grouped by centre cell, cells sorted: cells[i] holds items[starts[i]:starts[i + 1]]
+        self.loose_start = len(items)
+        self.items = items + list(loose)
+        self.rects = [item.rect for item in self.items]
+        self.reach = reach
+        self.keys = cells
+        self.starts = starts + [len(items)]
+        self.cells = dict(zip(cells, zip(starts, self.starts[1:])))
+        if not cells:
+            self.bounds = None
+            return
+        xs = [cx for cx, _ in cells]
+        ys = [cy for _, cy in cells]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def hits(self, rect):
+        # Indices of items whose rect collides with rect, one collidelistall per column of cells
+        keys = self.keys
+        starts = self.starts
+        rects = self.rects
+        found = []
+        x0, y0, x1, y1 = self.cell_range(rect, self.reach)
+        for cx in range(x0, x1 + 1):
+            start = starts[bisect_left(keys, (cx, y0))]
+            stop = starts[bisect_left(keys, (cx, y1 + 1))]
+            if start < stop:
+                found.extend(map(start.__add__, rect.collidelistall(rects[start:stop])))
+        loose = self.loose_start
+        if loose < len(rects):
+            found.extend(map(loose.__add__, rect.collidelistall(rects[loose:])))
+        return found
+
+    def loose_distances(self, x, y):
+        # (distance_squared, index) for every loose item
+        items = self.items
+        found = []
+        for index in range(self.loose_start, len(items)):
+            item = items[index]
+            dx = item.x - x
+            dy = item.y - y
+            found.append((dx * dx + dy * dy, index))
+        return found
+
+    def ring(self, cx, cy, r):
+        # Cells on the square ring r cells away from (cx, cy)
+        if r == 0:
+            yield cx, cy
+            return
+        for x in range(cx - r, cx + r + 1):
+            yield x, cy - r
+            yield x, cy + r
+        for y in range(cy - r + 1, cy + r):
+            yield cx - r, y
+            yield cx + r, y
+
+    def nearest(self, x, y, k=1):
+        # Up to k (distance_squared, index) pairs closest to (x, y), nearest first.
+        # Searches rings of cells outward and stops once no unsearched cell can be closer.
+        found = self.loose_distances(x, y)
+        if self.bounds is None:
+            return heapq.nsmallest(k, found)
+        cs = self.cell_size
+        cells = self.cells
+        items = self.items
+        qx, qy = int(x // cs), int(y // cs)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        last_ring = max(qx - min_cx, max_cx - qx, qy - min_cy, max_cy - qy)
+
+        for r in range(max(0, last_ring) + 1):
+            for cell in self.ring(qx, qy, r):
+                span = cells.get(cell)
+                if not span:
+                    continue
+                for index in range(*span):
+                    item = items[index]
+                    dx = item.x - x
+                    dy = item.y - y
+                    found.append((dx * dx + dy * dy, index))
+
+            # Anything in ring r+1 or beyond is at least r cells away
+            if len(found) >= k:
+                best = heapq.nsmallest(k, found)
+                if best[-1][0] <= (r * cs) ** 2:
+                    return best
+        return heapq.nsmallest(k, found)
+
+    def within(self, x, y, radius):
+        # Indices of items whose centre is within radius of (x, y), nearest first
+        cs = self.cell_size
+        cells = self.cells
+        items = self.items
+        r2 = radius * radius
+        found = [pair for pair in self.loose_distances(x, y) if pair[0] <= r2]
+        for cx in range(int((x - radius) // cs), int((x + radius) // cs) + 1):
+            for cy in range(int((y - radius) // cs), int((y + radius) // cs) + 1):
+                span = cells.get((cx, cy))
+                if not span:
+                    continue
+                for index in range(*span):
+                    item = items[index]
+                    dx = item.x - x
+                    dy = item.y - y
+                    d2 = dx * dx + dy * dy
+                    if d2 <= r2:
+                        found.append((d2, index))
+        found.sort()
+        return [index for _, index in found]
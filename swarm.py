@@ -0,0 +1,318 @@
+# swarm.py
+import pygame
+import app
+from enemy import EnemyBase
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the game falls back to per-object enemies
+    np = None
+
+# Per-enemy state stored as one array per field (structure of arrays)
+FIELDS = {
+    "x": "f8",
+    "y": "f8",
+    "speed": "f8",
+    "original_speed": "f8",
+    "knockback_dx": "f8",
+    "knockback_dy": "f8",
+    "knockback_dist_remaining": "f8",
+    "health": "i8",
+    "max_health": "i8",
+    "evolve_threshold": "i8",
+    "evolution_level": "i8",
+    "size_multiplier": "f8",
+    "frame_index": "i8",
+    "frame_count": "i8",
+    "animation_timer": "i8",
+    "animation_speed": "i8",
+    "facing_left": "?",
+    "low_detail": "?",
+}
+
+CELL_STRIDE = 1 << 32  # Packs a (cx, cy) grid cell into one int64 key
+
+def swarm_available():
+    return np is not None
+
+def cell_keys(xs, ys, cell_size):
+    # Grid cell of each point as cx, cy arrays, plus both packed into one sortable int64 key
+    cx = np.floor_divide(xs, cell_size).astype(np.int64)
+    cy = np.floor_divide(ys, cell_size).astype(np.int64)
+    return cx, cy, cx * CELL_STRIDE + cy
+
+def _field(name):
+    # Attribute that reads and writes the enemy's row in the swarm arrays
+    def get(self):
+        return self.store[name].item(self.slot)
+
+    def set(self, value):
+        self.store[name][self.slot] = value
+
+    return property(get, set)
+
+class SwarmEnemy(EnemyBase):
+    """Thin view over one row of an EnemySwarm. Drawing and collisions work as for Enemy."""
+    # Everything in FIELDS lives in the swarm arrays, so only the rest gets a slot
+    __slots__ = ("sprites", "frames", "image", "rect", "enemy_type", "entity_id", "evolve_timer",
+                 "swarm", "store", "slot")
+
+    def __init__(self, swarm, x, y, enemy_type, enemy_assets, speed=app.DEFAULT_ENEMY_SPEED):
+        self.swarm = swarm
+        self.store = swarm.arrays
+        self.slot = swarm.add(self)
+        super().__init__(x, y, enemy_type, enemy_assets, speed)
+        self.frame_count = len(self.frames)
+        self.animation_speed = EnemyBase.animation_speed
+
+    def update(self, player):
+        # Moved in bulk by EnemySwarm.update
+        pass
+
+    def detach(self):
+        # Keep a private copy of our row so the view stays readable after removal
+        slot = self.slot
+        self.store = {name: array[slot:slot + 1].copy() for name, array in self.store.items()}
+        self.slot = 0
+        self.swarm = None
+
+for _name in FIELDS:
+    setattr(SwarmEnemy, _name, _field(_name))
+
+class EnemySwarm:
+    """NumPy backend that advances every enemy in a handful of array operations per tick."""
+
+    def __init__(self, capacity=256):
+        if np is None:
+            raise ImportError("EnemySwarm requires numpy")
+        self.count = 0
+        self.views = []
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in FIELDS.items()}
+        # Evolution table as arrays, indexed by level
+        self.speed_factors = np.array([row[0] for row in SwarmEnemy.evolution])
+        self.sizes = np.array([row[1] for row in SwarmEnemy.evolution])
+        self.frame_extents = {}  # enemy_type -> largest frame side, for extent()
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, enemy_type, enemy_assets, speed=app.DEFAULT_ENEMY_SPEED):
+        view = SwarmEnemy(self, x, y, enemy_type, enemy_assets, speed)
+        if enemy_type not in self.frame_extents:
+            self.frame_extents[enemy_type] = max(max(frame.get_size()) for frame in view.frames)
+        return view
+
+    def extent(self):
+        # Upper bound on any enemy's rect width or height: largest frame at the largest size
+        n = self.count
+        if n == 0:
+            return 0
+        scale = max(1.0, self.arrays["size_multiplier"][:n].max())
+        return int(max(self.frame_extents.values()) * scale) + 1
+
+    def grid_order(self, cell_size, near=None):
+        # Views ordered by the grid cell holding their centre, from one sort of packed cell keys.
+        # Returns (items, cells, starts) for SpatialHash.load: cells[i] holds items[starts[i]:starts[i + 1]].
+        # near, a set of (cx, cy), keeps only the enemies centred in one of those cells.
+        n = self.count
+        cx, cy, keys = cell_keys(self.arrays["x"][:n], self.arrays["y"][:n], cell_size)
+
+        if near is None:
+            order = np.argsort(keys, kind="stable")
+        else:
+            wanted = np.array([x * CELL_STRIDE + y for x, y in near], dtype=np.int64)
+            picked = np.flatnonzero(np.isin(keys, wanted))
+            order = picked[np.argsort(keys[picked], kind="stable")]
+
+        keys = keys[order]
+        starts = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        if len(order):
+            starts = np.concatenate(([0], starts))
+        first = order[starts]
+        items = list(map(self.views.__getitem__, order.tolist()))
+        return items, list(zip(cx[first].tolist(), cy[first].tolist())), starts.tolist()
+
+    def add(self, view):
+        capacity = len(self.arrays["x"])
+        if self.count == capacity:
+            # Grow in place so views holding self.arrays see the new arrays
+            for name, array in self.arrays.items():
+                grown = np.zeros(capacity * 2, dtype=array.dtype)
+                grown[:capacity] = array
+                self.arrays[name] = grown
+
+        slot = self.count
+        self.count += 1
+        self.views.append(view)
+        return slot
+
+    def remove(self, view):
+        # O(1) swap-pop: move the last row into the freed slot
+        if view.swarm is not self:
+            return
+        slot = view.slot
+        last = self.count - 1
+        view.detach()
+
+        if slot != last:
+            for array in self.arrays.values():
+                array[slot] = array[last]
+            moved = self.views[last]
+            moved.slot = slot
+            self.views[slot] = moved
+
+        self.views.pop()
+        self.count = last
+
+    def clear(self):
+        for view in self.views:
+            view.detach()
+        self.views = []
+        self.count = 0
+
+    def update(self, player):
+        n = self.count
+        if n == 0:
+            return
+        a = {name: array[:n] for name, array in self.arrays.items()}
+        x, y = a["x"], a["y"]
+
+        # Knockback
+        kb_dist = a["knockback_dist_remaining"]
+        step = np.minimum(app.ENEMY_KNOCKBACK_SPEED, np.maximum(kb_dist, 0))
+        x += a["knockback_dx"] * step
+        y += a["knockback_dy"] * step
+        kb_dist -= step
+
+        # Chase the player, for enemies no longer being knocked back
+        moving = kb_dist <= 0
+        dx = player.x - x
+        dy = player.y - y
+        dist = np.maximum(np.hypot(dx, dy), 0.1)
+        scale = np.where(moving, a["speed"] / dist, 0.0)
+        x += dx * scale
+        y += dy * scale
+        a["facing_left"][moving] = dx[moving] < 0
+
+        # Animation, paused for low-detail enemies
+        a["animation_timer"] += ~a["low_detail"]
+        wrapped = a["animation_timer"] >= a["animation_speed"]
+        a["animation_timer"][wrapped] = 0
+        a["frame_index"][wrapped] = (a["frame_index"][wrapped] + 1) % a["frame_count"][wrapped]
+
+        self.sync_views(np.flatnonzero(wrapped))
+
+    def knockback(self, px, py, dist, radius=None):
+        # Shockwave from (px, py): every enemy (or those within radius) pushed straight away in one pass
+        n = self.count
+        if n == 0:
+            return
+        a = {name: array[:n] for name, array in self.arrays.items()}
+        dx = a["x"] - px
+        dy = a["y"] - py
+        length = np.sqrt(dx * dx + dy * dy)
+
+        hit = length > 0
+        if radius is not None:
+            hit &= length <= radius
+        a["knockback_dx"][hit] = dx[hit] / length[hit]
+        a["knockback_dy"][hit] = dy[hit] / length[hit]
+        a["knockback_dist_remaining"][hit] = dist
+
+    def mark_far(self, px, py, distance):
+        # Low detail for every enemy further than distance from (px, py)
+        n = self.count
+        dx = self.arrays["x"][:n] - px
+        dy = self.arrays["y"][:n] - py
+        self.arrays["low_detail"][:n] = dx * dx + dy * dy > distance * distance
+
+    def mark_crowded(self, cell_size, limit, others=()):
+        # Low detail for every enemy whose centre cell holds more than limit enemies,
+        # counting others (enemies outside the swarm) too. Returns which of others are crowded.
+        others = list(others)
+        n = self.count
+        xs = np.concatenate((self.arrays["x"][:n], [enemy.x for enemy in others]))
+        ys = np.concatenate((self.arrays["y"][:n], [enemy.y for enemy in others]))
+        _, _, keys = cell_keys(xs, ys, cell_size)
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        crowded = counts[inverse] > limit
+        self.arrays["low_detail"][:n] |= crowded[:n]
+        return crowded[n:].tolist()
+
+    def evolve(self, indices):
+        # Evolve the enemies in the given slots (a list or index array) together, from the stats table
+        a = self.arrays
+        a["evolution_level"][indices] += 1
+        stage = np.minimum(a["evolution_level"][indices], len(self.speed_factors) - 1)
+
+        a["max_health"][indices] += app.EVOLUTION_HEALTH_STEP
+        a["health"][indices] = a["max_health"][indices]
+        a["size_multiplier"][indices] = self.sizes[stage]
+        a["speed"][indices] = a["original_speed"][indices] * self.speed_factors[stage]
+
+        # Same as each view's evolve_image(), reading the rows in bulk instead of per property
+        views = self.views
+        rows = zip(np.asarray(indices).tolist(), a["frame_index"][indices].tolist(),
+                   a["evolution_level"][indices].tolist(), a["size_multiplier"][indices].tolist())
+        for i, frame_index, level, size in rows:
+            view = views[i]
+            view.image = view.sprites.image(view.enemy_type, frame_index, False, level, size)
+            view.rect = view.image.get_rect(center=view.rect.center)
+
+    def queue_draw(self, queue, view):
+        # Queue every enemy whose draw bounds touch view (a world-space rect), the same items as
+        # each view's queue_draw() but with the fields read as whole columns instead of per property.
+        # Returns the visible enemies' draw bounds, for dirty rects.
+        n = self.count
+        if n == 0:
+            return []
+        a = {name: array[:n] for name, array in self.arrays.items()}
+
+        # Cheap centre test first: stars and bars reach at most 8 px per level left and 8 px up
+        margin = self.extent() // 2 + 1 + 8 * int(a["evolution_level"].max()) + 8
+        x, y = a["x"], a["y"]
+        near = np.flatnonzero((x >= view.left - margin) & (x < view.right + margin)
+                              & (y >= view.top - margin) & (y < view.bottom + margin))
+        if len(near) == 0:
+            return []
+
+        columns = [a[name][near].tolist() for name in
+                   ("frame_index", "facing_left", "evolution_level", "size_multiplier", "low_detail",
+                    "health", "max_health")]
+        views = self.views
+        sprites, enemies, stars, bars, bounds = [], [], [], [], []
+        for i, frame_index, facing_left, level, size, low_detail, health, max_health in zip(near.tolist(), *columns):
+            enemy = views[i]
+            rect = enemy.rect
+            if low_detail:
+                drawn = rect.copy()
+            else:
+                left = min(rect.left, rect.right - 8 * level)
+                top = rect.top - 8
+                drawn = pygame.Rect(left, top, rect.right - left, rect.bottom - top)
+            if not view.colliderect(drawn):
+                continue
+            bounds.append(drawn)
+            sprites.append((enemy.sprites.image(enemy.enemy_type, frame_index, facing_left, level, size), rect))
+            if low_detail:
+                continue
+            if level > 0:
+                stars.append((app.evolution_stars(level), (rect.right - 8 * level, rect.top - 8)))
+            bars.append((app.health_bar(rect.width, health, max_health), (rect.x, rect.y - 8)))
+
+        queue.extend("enemies", sprites)
+        queue.extend("enemy_stars", stars)
+        queue.extend("enemy_bars", bars)
+        return bounds
+
+    def sync_views(self, animated):
+        # Push array state back into the pygame objects used for drawing and collision
+        views = self.views
+        for i in animated.tolist():
+            view = views[i]
+            view.image = view.current_image()
+            view.rect = view.image.get_rect()
+
+        n = self.count
+        for view, cx, cy in zip(views, self.arrays["x"][:n].tolist(), self.arrays["y"][:n].tolist()):
+            view.rect.center = (cx, cy)
@@ -0,0 +1,49 @@
+# test_replay.py
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import replay
+from game import Game
+from inputs import KeyState, MOVEMENT_KEYS
+
+# SDL2 keycodes for these are ~1e9, far past a u16
+WIDE_KEYS = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_F3, pygame.K_LSHIFT]
+
+def state(game):
+    player = game.player
+    return (game.tick, player.x, player.y, player.xp, player.level, player.health,
+            game.kills, len(game.enemies), len(game.coins), game.profiler.show_overlay)
+
+def test_record_load_play_round_trip(tmp_path):
+    path = str(tmp_path / "session.bin")
+    keys = KeyState()
+    game = Game(headless=True, seed=7, input_source=keys.get_pressed, record_path=path)
+    game.choose_upgrade = lambda options: 0
+    rng = random.Random(7)
+
+    for tick in range(900):
+        if tick % 30 == 0:
+            keys.set(rng.sample(list(MOVEMENT_KEYS[:4]), 2))
+        if tick % 11 == 0:
+            game.process_event(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(WIDE_KEYS)))
+        if tick % 7 == 0:
+            game.process_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        if tick % 50 == 0:
+            pos = (rng.randint(0, 800), rng.randint(0, 600))
+            game.process_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+        if game.step(1) == 0:
+            break
+    game.save_recording()
+
+    loaded = replay.Replay.load(path)
+    recorded_keys = {event.key for _, events in loaded.frames for event in events
+                     if not isinstance(event, tuple) and event.type == pygame.KEYDOWN}
+    assert set(WIDE_KEYS) <= recorded_keys
+
+    replayed = replay.play(path)
+    assert state(replayed) == state(game)